@@ -0,0 +1,342 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+import boto3
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+import requests
+import streamlit as st
+
+# Shared data helpers for the HR and Manager dashboards.
+
+# Candidate data is scanned once per process by a background thread. Pushed results are merged
+# into it as they arrive; the periodic full reload keeps it consistent with the table.
+RESULTS_TABLE_NAME = os.environ.get('RESULTS_TABLE_NAME', 'Resume_Matches')
+AWS_REGION = os.environ.get('AWS_REGION', 'us-east-1')
+CANDIDATE_REFRESH_SECONDS = int(os.environ.get('CANDIDATE_REFRESH_SECONDS', 45))
+CANDIDATE_MIN_RELOAD_SECONDS = 1
+CANDIDATE_COLD_WAIT_SECONDS = 30
+
+# The Flask service (resume.py) as reached from this process, and as reached from the user's
+# browser; every other Flask URL is derived from these two
+FLASK_API_URL = os.environ.get('FLASK_API_URL', 'http://localhost:5000')
+FLASK_PUBLIC_URL = os.environ.get('FLASK_PUBLIC_URL', 'http://localhost:5000')
+
+# Server-Sent Events stream published by the Flask service
+RESULTS_EVENTS_URL = f"{FLASK_API_URL}/events"
+LIVE_CHECK_SECONDS = 1
+
+# Streaming CSV/XLSX export; opened from the browser
+EXPORT_URL = f"{FLASK_PUBLIC_URL}/export/candidates"
+RESUME_LINKS_BATCH_SIZE = 500
+RESUME_LINKS_TTL_SECONDS = 30 * 60
+
+# Charts are built from pre-binned counts and cached as figure JSON per data version and filters
+SCORE_BIN_EDGES = np.linspace(0, 100, 21)
+CHART_CACHE_ENTRIES = 256
+
+
+class ResultsSubscriber:
+    """Background SSE client that follows new results from the Flask service.
+
+    Every candidate event's data is passed to `on_result`, so the candidate store can
+    merge a score as soon as it is written.
+    """
+
+    def __init__(self, url, on_result):
+        self.url = url
+        self.on_result = on_result
+        self._last_event_id = None
+        threading.Thread(target=self._run, name="results-subscriber", daemon=True).start()
+
+    def _run(self):
+        while True:
+            try:
+                self._listen()
+            except Exception as e:
+                print(f"Live results connection lost: {e}")
+            time.sleep(5)
+
+    def _listen(self):
+        headers = {'Accept': 'text/event-stream'}
+        if self._last_event_id:
+            headers['Last-Event-ID'] = self._last_event_id
+        # The read timeout only has to outlast the server's keep-alive comments
+        with requests.get(self.url, headers=headers, stream=True, timeout=(5, 60)) as response:
+            response.raise_for_status()
+            event_type, event_id, data = 'message', None, []
+            for line in response.iter_lines(decode_unicode=True):
+                if line:
+                    field, _, value = line.partition(':')
+                    if field == 'event':
+                        event_type = value.strip()
+                    elif field == 'id':
+                        event_id = value.strip()
+                    elif field == 'data':
+                        data.append(value[1:] if value.startswith(' ') else value)
+                    continue
+                # A blank line ends the event
+                if event_id:
+                    self._last_event_id = event_id
+                if event_type == 'candidate' and data:
+                    self.on_result(json.loads('\n'.join(data)))
+                event_type, event_id, data = 'message', None, []
+
+
+@st.cache_resource
+def start_results_subscriber(_on_result):
+    # One subscriber per dashboard process, shared by every browser session; pass CandidateStore.apply
+    # so pushed scores are merged into the store between scans
+    return ResultsSubscriber(RESULTS_EVENTS_URL, _on_result)
+
+
+def _version_line(item):
+    # A scan returns Score as a Decimal and a pushed result as an int or float; both hash the same
+    score = item.get('Score')
+    try:
+        score = float(score)
+    except (TypeError, ValueError):
+        pass
+    return (f"{item.get('ResumeID')}|{item.get('JDID')}|{score}|{item.get('Recommendation')}|"
+            f"{item.get('ExpMatch')}|{item.get('SkillsMatch')}|{item.get('Status')}").encode('utf-8')
+
+
+_VERSION_MODULUS = 1 << 160
+
+
+def _row_hash(item):
+    return int.from_bytes(hashlib.sha1(_version_line(item)).digest(), 'big')
+
+
+def _format_version(total):
+    return f"{total % _VERSION_MODULUS:040x}"
+
+
+def dataset_version(items):
+    """Content fingerprint of the candidate rows, used to key cached chart data.
+
+    It is the sum of per-row hashes, so it does not depend on row order and
+    CandidateStore._merge can update it row by row and still agree with a rescan.
+    """
+    return _format_version(sum(_row_hash(item) for item in items))
+
+
+CandidateSnapshot = namedtuple('CandidateSnapshot', 'items frame index version started_at error')
+
+
+def candidate_key(item):
+    return item.get('ResumeID'), item.get('JDID')
+
+
+def candidate_frame(items, index=None):
+    frame = pd.DataFrame(items, index=index)
+    if 'Score' in frame.columns:
+        frame['Score'] = pd.to_numeric(frame['Score'], errors='coerce').fillna(0)
+    return frame
+
+
+class CandidateStore:
+    """Process-wide copy of the candidate table, kept warm by a background thread.
+
+    The first scan starts as soon as the store is created and the table is rescanned every
+    CANDIDATE_REFRESH_SECONDS, or sooner after refresh(). Results pushed in between through
+    apply() are merged into the current snapshot by (ResumeID, JDID), at most once per
+    CANDIDATE_MIN_RELOAD_SECONDS, without a scan. Readers always get the last snapshot
+    straight from memory; only a read before the very first load completes waits.
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self._snapshot = CandidateSnapshot([], pd.DataFrame(), {}, None, 0, None)
+        self._loaded = threading.Condition()
+        self._wake = threading.Event()
+        self._reload_requested = False
+        self._pending = []
+        self._pending_lock = threading.Lock()
+        threading.Thread(target=self._run, name="candidate-warmup", daemon=True).start()
+
+    @property
+    def version(self):
+        return self._snapshot.version
+
+    def snapshot(self):
+        with self._loaded:
+            self._loaded.wait_for(lambda: self._snapshot.started_at, timeout=CANDIDATE_COLD_WAIT_SECONDS)
+        return self._snapshot
+
+    def refresh(self, wait=False):
+        """Ask for a full reload; with wait=True, block until a scan started after this call is in."""
+        requested_at = time.time()
+        self._reload_requested = True
+        self._wake.set()
+        if wait:
+            with self._loaded:
+                self._loaded.wait_for(lambda: self._snapshot.started_at >= requested_at,
+                                      timeout=CANDIDATE_COLD_WAIT_SECONDS)
+
+    def apply(self, result):
+        """Queue a pushed result (a candidate event's data) to be merged into the snapshot."""
+        with self._pending_lock:
+            self._pending.append(result)
+        self._wake.set()
+
+    def _scan(self):
+        items, kwargs = [], {}
+        while True:
+            response = self.table.scan(**kwargs)
+            items.extend(response['Items'])
+            if 'LastEvaluatedKey' not in response:
+                return items
+            kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    def _load(self):
+        started_at = time.time()
+        try:
+            items = self._scan()
+        except Exception as e:
+            print(f"Error loading candidates: {e}")
+            # Keep serving the previous data; the error is only shown if there is none
+            return self._snapshot._replace(started_at=started_at, error=str(e))
+        index = {candidate_key(item): position for position, item in enumerate(items)}
+        return CandidateSnapshot(items, candidate_frame(items), index, dataset_version(items), started_at, None)
+
+    def _merge(self, base, results):
+        # Copy-on-write, so readers holding the previous snapshot never see it change
+        items, index, changed = list(base.items), dict(base.index), {}
+        total = int(base.version, 16) if base.version else 0
+        for result in results:
+            key = candidate_key(result)
+            if None in key:
+                continue
+            position = index.setdefault(key, len(items))
+            if position == len(items):
+                items.append({})
+            fields = {k: v for k, v in result.items() if k != 'batchId' and v is not None}
+            if items[position]:
+                total -= _row_hash(items[position])
+            items[position] = changed[position] = {**items[position], **fields}
+            total += _row_hash(items[position])
+        if not changed:
+            return base
+
+        updates = candidate_frame(list(changed.values()), index=list(changed))
+        kept = base.frame.drop(index=[p for p in changed if p < len(base.items)])
+        frame = pd.concat([kept, updates]).sort_index()
+        return base._replace(items=items, frame=frame, index=index, version=_format_version(total))
+
+    def _run(self):
+        next_reload = 0
+        while True:
+            self._wake.clear()
+            snapshot = self._snapshot
+            if self._reload_requested or time.monotonic() >= next_reload:
+                self._reload_requested = False
+                snapshot = self._load()
+                next_reload = time.monotonic() + CANDIDATE_REFRESH_SECONDS
+            # Results that arrived during a reload go on top of it; merging one the scan
+            # already picked up is harmless, since a merge is an upsert
+            with self._pending_lock:
+                results, self._pending = self._pending, []
+            if results:
+                snapshot = self._merge(snapshot, results)
+            if snapshot is not self._snapshot:
+                with self._loaded:
+                    self._snapshot = snapshot
+                    self._loaded.notify_all()
+            self._wake.wait(max(0, next_reload - time.monotonic()))
+            # A burst of new results is merged in one go
+            time.sleep(CANDIDATE_MIN_RELOAD_SECONDS)
+
+
+_candidate_stores = {}
+_candidate_stores_lock = threading.Lock()
+
+
+def get_candidate_store(table_name=RESULTS_TABLE_NAME):
+    """The shared CandidateStore for this process, created (and started) on first use."""
+    with _candidate_stores_lock:
+        if table_name not in _candidate_stores:
+            table = boto3.resource('dynamodb', region_name=AWS_REGION).Table(table_name)
+            _candidate_stores[table_name] = CandidateStore(table)
+        return _candidate_stores[table_name]
+
+
+@st.fragment(run_every=LIVE_CHECK_SECONDS)
+def live_refresh(store):
+    """Rerun the page within about a second of the candidate store picking up new data.
+
+    The fragment only compares an in-memory fingerprint, so nothing is fetched here.
+    """
+    seen = st.session_state.setdefault('results_version', store.version)
+    if store.version != seen:
+        st.session_state['results_version'] = store.version
+        st.rerun()
+
+
+def filter_hash(**filters):
+    return hashlib.sha1(json.dumps(filters, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def score_histogram(scores, recommendations, title, color_map):
+    """Stacked score histogram built from NumPy bin counts instead of row-level data."""
+    scores = np.clip(np.asarray(scores, dtype=float), SCORE_BIN_EDGES[0], SCORE_BIN_EDGES[-1])
+    recommendations = pd.Series(recommendations).fillna('N/A').astype(str).to_numpy()
+    centers = (SCORE_BIN_EDGES[:-1] + SCORE_BIN_EDGES[1:]) / 2
+    widths = np.diff(SCORE_BIN_EDGES)
+
+    fig = go.Figure()
+    for rec in pd.unique(recommendations):
+        counts, _ = np.histogram(scores[recommendations == rec], bins=SCORE_BIN_EDGES)
+        fig.add_bar(x=centers, y=counts, width=widths, name=rec, marker_color=color_map.get(rec))
+    fig.update_layout(title=title, barmode='stack', bargap=0,
+                      xaxis_title='Score', yaxis_title='count', legend_title_text='Recommendation')
+    return fig
+
+
+def count_bar(counts, title, x_label, color_map):
+    """Bar chart of already-aggregated category counts (e.g. a value_counts() result)."""
+    fig = go.Figure()
+    for label, count in counts.items():
+        fig.add_bar(x=[label], y=[int(count)], name=str(label), marker_color=color_map.get(label))
+    fig.update_layout(title=title, xaxis_title=x_label, yaxis_title='Count', legend_title_text=x_label)
+    return fig
+
+
+@st.cache_data(max_entries=CHART_CACHE_ENTRIES, show_spinner=False)
+def cached_figure_json(version, filters_key, chart, _build):
+    # Keyed only by the explicit arguments; _build is not hashed
+    return _build().to_json()
+
+
+def render_chart(version, filters_key, chart, build):
+    """Draw a chart, rebuilding it only when the data version or the filters change.
+
+    `build` returns a figure from pre-binned counts (score_histogram, count_bar); its JSON
+    is cached per (version, filters_key, chart).
+    """
+    figure_json = cached_figure_json(version, filters_key, chart, build)
+    st.plotly_chart(pio.from_json(figure_json), use_container_width=True)
+
+
+@st.cache_data(ttl=RESUME_LINKS_TTL_SECONDS, show_spinner=False)
+def fetch_resume_links(references):
+    """Download-proxy links for the resumes on screen, requested in bulk and reused across reruns.
+
+    Returns {ResumeURL or ResumeID: link}; references the link service does not recognise
+    are left out so callers can fall back to the stored URL. Request failures raise, so a
+    partial result is never cached.
+    """
+    links = {}
+    references = list(references)
+    for i in range(0, len(references), RESUME_LINKS_BATCH_SIZE):
+        response = requests.post(f"{FLASK_API_URL}/resume-links",
+                                 json={'keys': references[i:i + RESUME_LINKS_BATCH_SIZE]}, timeout=10)
+        response.raise_for_status()
+        for reference, link in response.json()['links'].items():
+            links[reference] = FLASK_PUBLIC_URL + link['downloadPath']
+    return links
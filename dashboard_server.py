@@ -0,0 +1,14 @@
+import sys
+from streamlit.web import cli as stcli
+from dashboard_data import get_candidate_store
+
+# Starts a dashboard the same way `streamlit run` does, but begins loading candidate data
+# before the server accepts its first session. The page scripts import dashboard_data from
+# the same process, so they pick up the already-warm store.
+#
+#   python dashboard_server.py new_hr.py --server.port=8502
+
+if __name__ == '__main__':
+    get_candidate_store()
+    sys.argv = ['streamlit', 'run', *sys.argv[1:]]
+    sys.exit(stcli.main())
@@ -1,17 +1,16 @@
 import streamlit as st
 import boto3
 import pandas as pd
-import plotly.express as px
 from botocore.exceptions import ClientError
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.mime.application import MIMEApplication
 from fpdf import FPDF
 import os
+from dashboard_data import (start_results_subscriber, live_refresh, get_candidate_store, filter_hash,
+                            score_histogram, count_bar, render_chart, FLASK_PUBLIC_URL)
 
-# Initialize DynamoDB resources
-dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
-table = dynamodb.Table('Resume_Matches')
+candidate_store = get_candidate_store()
 
 # Initialize AWS SES client
 ses_client = boto3.client('ses', region_name='us-east-1')
@@ -109,14 +108,14 @@ tbody tr:hover {
 """, unsafe_allow_html=True)
 
 
-@st.cache_data(ttl=60)
 def fetch_candidates():
-    try:
-        response = table.scan()
-        return response['Items']
-    except Exception as e:
-        st.error(f"Error fetching candidates: {e}")
-        return []
+    snapshot = candidate_store.snapshot()
+    if snapshot.error and not snapshot.items:
+        st.error(f"Error fetching candidates: {snapshot.error}")
+    return snapshot.items, snapshot.version
+
+
+start_results_subscriber(candidate_store.apply)
 
 
 def get_badge_html(rec):
@@ -210,10 +209,11 @@ HR Team
 
 def hr_dashboard():
     st.title("🎯 HR DASHBOARD")
+    live_refresh(candidate_store)
 
     # Sidebar button to open Flask upload page in new tab
     if st.sidebar.button("Open Upload Page"):
-        flask_upload_url = "http://localhost:5000/"  # Adjust if your Flask runs on different host/port
+        flask_upload_url = f"{FLASK_PUBLIC_URL}/"
         st.markdown(f'[Click here to upload Resume & JD]({flask_upload_url}){{:target="_blank"}}',
                     unsafe_allow_html=True)
         st.info("Upload page will open in a new browser tab.")
@@ -226,7 +226,8 @@ def hr_dashboard():
     skill_filter = st.sidebar.text_input("Skills Match filter (partial text)", "")
     st.sidebar.markdown("---")
 
-    candidates = fetch_candidates()
+    candidates, data_version = fetch_candidates()
+    filters_key = filter_hash(score_min=score_threshold, exp=exp_filter, skill=skill_filter)
 
     if not candidates:
         st.warning("No candidates found in DynamoDB.")
@@ -283,27 +284,20 @@ def hr_dashboard():
     }
 
     with col1:
-        rec_counts = df['Recommendation'].value_counts()
-        fig_rec = px.bar(
-            x=rec_counts.index,
-            y=rec_counts.values,
-            labels={'x': 'Recommendation', 'y': 'Count'},
-            title="Candidates by Recommendation",
-            color=rec_counts.index,
-            color_discrete_map=rec_color_map
-        )
-        st.plotly_chart(fig_rec, use_container_width=True)
+        render_chart(data_version, filters_key, 'recommendation', lambda: count_bar(
+            df['Recommendation'].value_counts(),
+            "Candidates by Recommendation",
+            'Recommendation',
+            rec_color_map
+        ))
 
     with col2:
-        fig_score = px.histogram(
-            df,
-            x='Score',
-            nbins=20,
-            title="Score Distribution",
-            color=df['Recommendation'],
-            color_discrete_map=rec_color_map
-        )
-        st.plotly_chart(fig_score, use_container_width=True)
+        render_chart(data_version, filters_key, 'score', lambda: score_histogram(
+            df['Score'].to_numpy(),
+            df['Recommendation'],
+            "Score Distribution",
+            rec_color_map
+        ))
 
     total_candidates = len(df)
     num_approved = df['Recommendation'].str.lower().eq('approved').sum()
@@ -317,20 +311,17 @@ def hr_dashboard():
     kpi3.metric("Average Score", f"{avg_score:.2f}")
 
     st.subheader("Candidates by Experience Level")
-    fig_exp = px.bar(
-        x=exp_counts.index,
-        y=exp_counts.values,
-        labels={'x': 'Experience Level', 'y': 'Count'},
-        title="Candidate Distribution by Experience Level",
-        color=exp_counts.index,
-        color_discrete_map={
+    render_chart(data_version, filters_key, 'experience', lambda: count_bar(
+        exp_counts,
+        "Candidate Distribution by Experience Level",
+        'Experience Level',
+        {
             'Junior': '#42A5F5',
             'Mid': '#66BB6A',
             'Senior': '#EF5350',
             'Other': '#AB47BC'
         }
-    )
-    st.plotly_chart(fig_exp, use_container_width=True)
+    ))
 
     st.subheader("Send Offer Letters")
 
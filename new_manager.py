@@ -2,13 +2,17 @@ import streamlit as st
 import boto3
 import pandas as pd
 from urllib.parse import urlencode
-import plotly.express as px
 from streamlit_cognito_auth import CognitoAuthenticator
+from dashboard_data import (start_results_subscriber, live_refresh, get_candidate_store, filter_hash,
+                            score_histogram, count_bar, render_chart, fetch_resume_links, EXPORT_URL)
 
 # Initialize DynamoDB tables
 dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
 resume_table = dynamodb.Table('Resume_Matches')
 
+candidate_store = get_candidate_store()
+
+STATUS_OPTIONS = ['Pending', 'Reviewed', 'Interview Scheduled', 'Rejected', 'Hired']
 
 
 st.set_page_config(page_title="Manager Dashboard", layout="wide")
@@ -119,10 +123,14 @@ a:hover {
 
 
 
-@st.cache_data(ttl=60)
 def fetch_candidates():
-    response = resume_table.scan()
-    return response['Items']
+    # The store keeps a ready-made DataFrame with Score already numeric
+    snapshot = candidate_store.snapshot()
+    if snapshot.error and snapshot.frame.empty:
+        st.error(f"Error fetching candidates: {snapshot.error}")
+    return snapshot.frame, snapshot.version
+
+start_results_subscriber(candidate_store.apply)
 
 def update_candidate_status(resume_id, jd_id, status, comments):
     try:
@@ -168,6 +176,14 @@ def generate_resume_link(url):
     else:
         return "No Resume"
 
+def resume_reference(row):
+    # The stored URL if there is one, otherwise the S3 key kept in ResumeID
+    for field in ('ResumeURL', 'ResumeID'):
+        value = row.get(field)
+        if isinstance(value, str) and value.strip():
+            return value.strip()
+    return None
+
 def generate_interview_link(name, email):
     base_url = "https://calendly.com/aalapsk07/30min"
     params = urlencode({'name': name, 'email': email})
@@ -175,10 +191,11 @@ def generate_interview_link(name, email):
     return f'<a href="{full_url}" target="_blank">📅 Schedule</a>'
 
 def manager_dashboard():
+    live_refresh(candidate_store)
 
     st.sidebar.header("Controls")
     if st.sidebar.button("Refresh Data"):
-        fetch_candidates.clear()
+        candidate_store.refresh(wait=True)
         if hasattr(st, 'experimental_rerun'):
             st.experimental_rerun()
         else:
@@ -186,14 +203,14 @@ def manager_dashboard():
 
     st.title("🧑‍💼 Manager Dashboard - Shortlisted Candidates")
 
-    candidates = fetch_candidates()
+    candidates, data_version = fetch_candidates()
 
-    if not candidates:
+    if candidates.empty:
         st.warning("No candidates found in ResumeMatches.")
         return
 
-    df = pd.DataFrame(candidates)
-    df['Score'] = pd.to_numeric(df['Score'], errors='coerce').fillna(0)
+    # Copy so per-session column fixes never touch the shared frame
+    df = candidates.copy()
 
 
     # Fix missing columns
@@ -210,6 +227,8 @@ def manager_dashboard():
     min_score, max_score = st.sidebar.slider("Score Range", 0, 100, (0, 100))
     exp_filter = st.sidebar.text_input("Experience Match filter (comma separated)", "")
     skill_filter = st.sidebar.text_input("Skills Match filter (comma separated)", "")
+    jd_filter = st.sidebar.multiselect("Job ID", options=sorted(df['JDID'].dropna().astype(str).unique()))
+    status_filter = st.sidebar.multiselect("Status", options=STATUS_OPTIONS)
 
     if exp_filter:
         exp_list = [x.strip().lower() for x in exp_filter.split(",")]
@@ -218,7 +237,26 @@ def manager_dashboard():
         skill_list = [x.strip().lower() for x in skill_filter.split(",")]
         df = df[df['SkillsMatch'].str.lower().apply(lambda x: any(s in x for s in skill_list) if isinstance(x, str) else False)]
 
+    if jd_filter:
+        df = df[df['JDID'].astype(str).isin(jd_filter)]
+    if status_filter:
+        df = df[df['Status'].isin(status_filter)]
+
     df = df[(df['Score'] >= min_score) & (df['Score'] <= max_score)]
+    filters_key = filter_hash(score_range=[min_score, max_score], exp=exp_filter, skill=skill_filter,
+                              jd=jd_filter, status=status_filter)
+
+    # The export re-applies these filters server-side and streams every matching row
+    export_params = urlencode({
+        'min_score': min_score, 'max_score': max_score, 'exp': exp_filter, 'skills': skill_filter,
+        'jdid': jd_filter, 'status': status_filter
+    }, doseq=True)
+    st.sidebar.subheader("Export Report")
+    st.sidebar.markdown(
+        f'<a href="{EXPORT_URL}?format=csv&{export_params}" target="_blank">⬇️ CSV</a> &nbsp; '
+        f'<a href="{EXPORT_URL}?format=xlsx&{export_params}" target="_blank">⬇️ Excel</a>',
+        unsafe_allow_html=True
+    )
 
     if df.empty:
         st.info("No candidates found matching current filters.")
@@ -256,6 +294,15 @@ def manager_dashboard():
         st.dataframe(comp_df.T, use_container_width=True)
 
     st.subheader("Candidate Details & Status Update")
+    # One bulk request signs links for every candidate shown; reruns reuse the cached result
+    resume_refs = [resume_reference(row) for _, row in df.iterrows()]
+    try:
+        resume_links = fetch_resume_links(tuple(ref for ref in resume_refs if ref))
+    except Exception as e:
+        # Not cached, so the next rerun asks again; stored URLs are not offered meanwhile
+        print(f"Error fetching resume links: {e}")
+        st.warning("Resume links are temporarily unavailable.")
+        resume_links = None
     for idx, row in df.iterrows():
         with st.expander(f"{row['Name']} - Score: {row['Score']} - Status: {row['Status']}"):
             st.markdown(f"**Email:** {row['Email']}")
@@ -264,18 +311,21 @@ def manager_dashboard():
             st.markdown(f"**Skills Match:** {row['SkillsMatch']}")
             st.markdown(f"**Recommendation:** {row.get('Recommendation', 'N/A')}")
             st.markdown(f"**Summary:** {row.get('Summary', 'No summary available')}")
-            st.markdown(f"**Resume:** {generate_resume_link(row.get('ResumeURL', ''))}", unsafe_allow_html=True)
+            if resume_links is None:
+                st.markdown("**Resume:** Link unavailable")
+            else:
+                resume_url = resume_links.get(resume_reference(row))
+                st.markdown(f"**Resume:** {generate_resume_link(resume_url or row.get('ResumeURL', ''))}", unsafe_allow_html=True)
             st.markdown(
                 f"**Interview Scheduling:** {generate_interview_link(row['Name'], row['Email'])}",
                 unsafe_allow_html=True
             )
 
-            status_options = ['Pending', 'Reviewed', 'Interview Scheduled', 'Rejected', 'Hired']
             current_status = row['Status']
             status = st.selectbox(
                 "Update Status",
-                options=status_options,
-                index=status_options.index(current_status) if current_status in status_options else 0,
+                options=STATUS_OPTIONS,
+                index=STATUS_OPTIONS.index(current_status) if current_status in STATUS_OPTIONS else 0,
                 key=f"status_{idx}"
             )
 
@@ -284,8 +334,8 @@ def manager_dashboard():
             if st.button("Save Update", key=f"save_{idx}"):
                 if update_candidate_status(row['ResumeID'], row['JDID'], status, comments):
                     st.success("Status and comments saved!")
-                    fetch_candidates.clear()
-                    st.sidebar.info("Data updated! Please click 'Refresh Data' to reload.")
+                    candidate_store.refresh()
+                    st.sidebar.info("Data updated! The table will reload in a moment.")
                 else:
                     st.error("Failed to save updates.")
 
@@ -301,27 +351,20 @@ def manager_dashboard():
     }
 
     with col1:
-        rec_counts = df['Recommendation'].value_counts()
-        fig_rec = px.bar(
-            x=rec_counts.index,
-            y=rec_counts.values,
-            labels={'x': 'Recommendation', 'y': 'Count'},
-            title="Recommendation Overview",
-            color=rec_counts.index,
-            color_discrete_map=rec_color_map
-        )
-        st.plotly_chart(fig_rec, use_container_width=True)
+        render_chart(data_version, filters_key, 'recommendation', lambda: count_bar(
+            df['Recommendation'].value_counts(),
+            "Recommendation Overview",
+            'Recommendation',
+            rec_color_map
+        ))
 
     with col2:
-        fig_score = px.histogram(
-            df,
-            x='Score',
-            nbins=20,
-            title="Score Distribution",
-            color=df['Recommendation'],
-            color_discrete_map=rec_color_map
-        )
-        st.plotly_chart(fig_score, use_container_width=True)
+        render_chart(data_version, filters_key, 'score', lambda: score_histogram(
+            df['Score'].to_numpy(),
+            df['Recommendation'],
+            "Score Distribution",
+            rec_color_map
+        ))
 
 if __name__ == "__main__":
     manager_dashboard()
@@ -1,22 +1,1143 @@
 # bedrock_flask.py - Final version for selecting existing JDs
 
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, Response, request, jsonify, render_template, stream_with_context
 from flask_cors import CORS
 import boto3
+import csv
+import functools
+import hashlib
+import hmac
+import html
+import io
+import itertools
+import json
+import math
 import os
+import queue
+import re
+import threading
 import time
+import unicodedata
+import uuid
+import zipfile
 import requests
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from urllib.parse import quote, unquote, urlparse
+from xml.sax.saxutils import escape as xml_escape
+from boto3.dynamodb.conditions import Attr
+from boto3.dynamodb.types import TypeDeserializer
+from pypdf import PdfReader
+from werkzeug.datastructures import MultiDict
+from werkzeug.sansio.multipart import MultipartDecoder, NeedData, Field, File, Data, Epilogue
 
 # --- Configuration ---
 S3_BUCKET_NAME = 'agentic-ai-screener-data'
 N8N_WEBHOOK_URL = 'https://adriani.app.n8n.cloud/webhook/4c813ee5-c489-4a54-b7c5-63ecfab488c8'
 S3_JD_FOLDER = 'job-descriptions/'
 S3_RESUMES_FOLDER = 'resumes/pending/'
+S3_MANIFESTS_FOLDER = 'resumes/manifests/'
+MAX_JDS_PER_BATCH = int(os.environ.get('MAX_JDS_PER_BATCH', 10))
+AWS_REGION = 'us-east-1'
+RESULTS_TABLE_NAME = 'Resume_Matches'
+
+# --- Streaming upload limits ---
+# Resumes are parsed off the request stream and piped straight into S3, so memory per
+# request is bounded by one S3 part buffer plus one read chunk, whatever the batch size.
+UPLOAD_READ_CHUNK_BYTES = 64 * 1024
+UPLOAD_PART_SIZE_BYTES = int(os.environ.get('UPLOAD_PART_SIZE_BYTES', 8 * 1024 * 1024))  # S3 minimum is 5 MB
+UPLOAD_MAX_FILE_BYTES = int(os.environ.get('UPLOAD_MAX_FILE_BYTES', 25 * 1024 * 1024))
+UPLOAD_MAX_BATCH_BYTES = int(os.environ.get('UPLOAD_MAX_BATCH_BYTES', 2 * 1024 * 1024 * 1024))
+UPLOAD_MAX_FILES = int(os.environ.get('UPLOAD_MAX_FILES', 1000))
+UPLOAD_MAX_FIELD_BYTES = 64 * 1024
+
+# --- Archive ingest ---
+# ZIP archives are read in place from S3 with ranged GETs, never unpacked to disk.
+# Archives named by 'archive_key' must live under S3_ARCHIVES_FOLDER; uploaded archives are
+# staged in their own sub-folder, which callers cannot name
+S3_ARCHIVES_FOLDER = 'archives/'
+S3_STAGED_ARCHIVES_FOLDER = 'archives/staged/'
+SUPPORTED_RESUME_EXTENSIONS = ('.pdf', '.doc', '.docx')
+ARCHIVE_MAX_ENTRIES = int(os.environ.get('ARCHIVE_MAX_ENTRIES', 5000))
+ARCHIVE_INGEST_WORKERS = int(os.environ.get('ARCHIVE_INGEST_WORKERS', 8))
+ARCHIVE_READ_BUFFER_BYTES = 1024 * 1024
+
+# --- Job description preprocessing cache ---
+# Parsed JDs are kept per S3 key and reused while the object's ETag is unchanged.
+JD_CACHE_MAX_ENTRIES = int(os.environ.get('JD_CACHE_MAX_ENTRIES', 128))
+JD_TERM_VECTOR_SIZE = 200
+JD_TEXT_EXTENSIONS = ('.txt', '.md')
+JD_STOPWORDS = frozenset("""
+a about above after all also an and any are as at be been being both but by can could do
+does each etc for from has have how if in into is it its may more most must no not of on
+or other our out over per role such than that the their them then there these they this
+those through to up us we well what when where which while who will with within would you your
+""".split())
+JD_SKILL_VOCABULARY = frozenset([
+    'python', 'java', 'javascript', 'typescript', 'c++', 'c#', 'go', 'rust', 'ruby', 'php', 'scala',
+    'kotlin', 'swift', 'sql', 'nosql', 'html', 'css', 'react', 'angular', 'vue', 'node.js',
+    'django', 'flask', 'spring', '.net', 'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'terraform',
+    'linux', 'git', 'jenkins', 'ci/cd', 'rest', 'graphql', 'microservices', 'kafka', 'spark',
+    'hadoop', 'airflow', 'postgresql', 'mysql', 'mongodb', 'dynamodb', 'redis', 'elasticsearch',
+    'pandas', 'numpy', 'tensorflow', 'pytorch', 'scikit-learn', 'machine learning', 'deep learning',
+    'nlp', 'computer vision', 'data analysis', 'data engineering', 'tableau', 'power bi', 'excel',
+    'agile', 'scrum', 'jira', 'project management', 'communication', 'leadership'
+])
+# Skills whose names are also everyday words only count in a technology context
+JD_CONTEXT_SKILLS = {
+    'go': r'golang|go\s+(?:language|programming|developer|engineer)',
+    'rest': r'restful|rest\s*(?:apis?|services?|endpoints?)',
+    'spring': r'spring\s+(?:boot|framework|mvc|cloud|data|security)',
+    'spark': r'apache\s+spark|pyspark|spark\s+(?:sql|streaming|jobs?)',
+    'swift': r'swiftui|swift\s+(?:language|programming|developer)',
+    'excel': r'(?:microsoft|ms|advanced)\s+excel|excel\s+(?:spreadsheets?|formulas?|macros?|vba)',
+}
+
+# --- Admission control ---
+# A batch holds its slot from submission until its last result arrives, through the table
+# stream or POST /batches/<id>/results, or until the TTL passes. Without a table stream only
+# posted results are seen, so batches fall back to the much shorter untracked TTL.
+ADMISSION_MAX_BATCHES = int(os.environ.get('ADMISSION_MAX_BATCHES', 8))
+ADMISSION_MAX_BATCHES_PER_USER = int(os.environ.get('ADMISSION_MAX_BATCHES_PER_USER', 2))
+ADMISSION_MAX_FILES = int(os.environ.get('ADMISSION_MAX_FILES', 10000))
+ADMISSION_MAX_FILES_PER_USER = int(os.environ.get('ADMISSION_MAX_FILES_PER_USER', 5000))
+ADMISSION_WAIT_SECONDS = float(os.environ.get('ADMISSION_WAIT_SECONDS', 5))
+ADMISSION_BATCH_TTL_SECONDS = int(os.environ.get('ADMISSION_BATCH_TTL_SECONDS', 30 * 60))
+ADMISSION_UNTRACKED_BATCH_TTL_SECONDS = int(os.environ.get('ADMISSION_UNTRACKED_BATCH_TTL_SECONDS', 5 * 60))
+ADMISSION_RETRY_AFTER_SECONDS = 30
+# A batch larger than the admission caps could never be admitted, so the upload limits never exceed them
+UPLOAD_MAX_FILES = min(UPLOAD_MAX_FILES, ADMISSION_MAX_FILES_PER_USER, ADMISSION_MAX_FILES)
+ARCHIVE_MAX_ENTRIES = min(ARCHIVE_MAX_ENTRIES, ADMISSION_MAX_FILES_PER_USER, ADMISSION_MAX_FILES)
+
+# --- Idempotency keys ---
+# Successful submissions are remembered per Idempotency-Key so a retried request is answered
+# with the original batch instead of uploading and triggering again.
+IDEMPOTENCY_TTL_SECONDS = int(os.environ.get('IDEMPOTENCY_TTL_SECONDS', 24 * 60 * 60))
+IDEMPOTENCY_MAX_ENTRIES = 10000
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+
+# --- Resume download links ---
+# Presigned GET URLs are signed in bulk and reused until shortly before they expire.
+RESUME_LINK_EXPIRY_SECONDS = int(os.environ.get('RESUME_LINK_EXPIRY_SECONDS', 60 * 60))
+RESUME_LINK_REFRESH_MARGIN_SECONDS = 5 * 60
+RESUME_LINK_CACHE_MAX_ENTRIES = 10000
+RESUME_LINKS_MAX_KEYS = 500
+RESUME_PROXY_CHUNK_BYTES = 256 * 1024
+
+# --- Candidate export ---
+EXPORT_PAGE_SIZE = 1000
+EXPORT_COLUMNS = ['ResumeID', 'Name', 'Email', 'JDID', 'Score', 'ExpMatch', 'SkillsMatch',
+                  'Recommendation', 'Status', 'ManagerNotes']
+
+# --- Result ingest ---
+# Scored candidates posted back by the n8n workflow, written with BatchWriteItem (25 per request)
+RESULTS_INGEST_MAX_ITEMS = int(os.environ.get('RESULTS_INGEST_MAX_ITEMS', 5000))
+# Shared secret the workflow sends as 'Authorization: Bearer <token>'; without it, posting is disabled
+RESULTS_INGEST_TOKEN = os.environ.get('RESULTS_INGEST_TOKEN', '')
+# The scorer's fields as the dashboards display them; ManagerNotes is written by the Manager dashboard
+RESULT_REQUIRED_FIELDS = ('ResumeID', 'JDID', 'Score')
+RESULT_TEXT_FIELDS = ('Name', 'Email', 'ExpMatch', 'SkillsMatch', 'Recommendation', 'Summary',
+                      'ResumeURL', 'Status')
+RESULT_TEXT_MAX_LENGTH = 10000
+RESULT_ERRORS_REPORTED = 20
+
+# --- Live result events ---
+# Results are tailed from the Resume_Matches DynamoDB stream (NEW_IMAGE) and pushed to
+# the upload page and dashboards over Server-Sent Events.
+EVENT_HISTORY_SIZE = 1000
+# Everything the dashboards display, so they can merge a result without rescanning the table
+CANDIDATE_EVENT_FIELDS = RESULT_REQUIRED_FIELDS + RESULT_TEXT_FIELDS
+EVENT_SUBSCRIBER_QUEUE_SIZE = 1000
+EVENT_HEARTBEAT_SECONDS = 15
+TRACKED_BATCHES_LIMIT = 1000
+RESULTS_STREAM_POLL_SECONDS = 0.5
+RESULTS_STREAM_DISCOVERY_SECONDS = 60
 
 # --- Initialize App & Boto3 ---
 app = Flask(__name__)
-CORS(app)
+# Only the submission API is open cross-origin. Candidate data (live events, exports, resume
+# links) is read by the page Flask serves itself or by the dashboards server-side.
+CORS_RESOURCES = r"^/(get-jds|jd-profile|upload-and-trigger|ingest-archive)$"
+CORS(app, resources={CORS_RESOURCES: {}}, expose_headers=['Retry-After', 'Idempotent-Replayed'])
 s3_client = boto3.client('s3')
+dynamodb_client = boto3.client('dynamodb', region_name=AWS_REGION)
+streams_client = boto3.client('dynamodbstreams', region_name=AWS_REGION)
+results_table = boto3.resource('dynamodb', region_name=AWS_REGION).Table(RESULTS_TABLE_NAME)
+
+# --- Streaming upload helpers ---
+class UploadLimitExceeded(Exception):
+    pass
+
+class S3StreamingUpload:
+    """Pipes one file into S3 chunk by chunk.
+
+    Small files go up with a single put_object; once a file outgrows one part it is
+    switched to a multipart upload so only UPLOAD_PART_SIZE_BYTES is ever buffered.
+    """
+
+    def __init__(self, bucket, key, filename=None):
+        self.bucket = bucket
+        self.key = key
+        self.filename = filename or os.path.basename(key)
+        self.size = 0
+        self._sha256 = hashlib.sha256()
+        self._buffer = bytearray()
+        self._upload_id = None
+        self._parts = []
+
+    def write(self, data):
+        self._buffer += data
+        self.size += len(data)
+        self._sha256.update(data)
+        while len(self._buffer) >= UPLOAD_PART_SIZE_BYTES:
+            self._upload_part(bytes(self._buffer[:UPLOAD_PART_SIZE_BYTES]))
+            del self._buffer[:UPLOAD_PART_SIZE_BYTES]
+
+    @property
+    def sha256(self):
+        return self._sha256.hexdigest()
+
+    def describe(self):
+        return {'key': self.key, 'filename': self.filename, 'size': self.size, 'sha256': self.sha256}
+
+    def _upload_part(self, body):
+        if self._upload_id is None:
+            response = s3_client.create_multipart_upload(Bucket=self.bucket, Key=self.key)
+            self._upload_id = response['UploadId']
+        part_number = len(self._parts) + 1
+        response = s3_client.upload_part(
+            Bucket=self.bucket, Key=self.key, UploadId=self._upload_id,
+            PartNumber=part_number, Body=body
+        )
+        self._parts.append({'ETag': response['ETag'], 'PartNumber': part_number})
+
+    def complete(self):
+        if self._upload_id is None:
+            s3_client.put_object(Bucket=self.bucket, Key=self.key, Body=bytes(self._buffer))
+        else:
+            if self._buffer:
+                self._upload_part(bytes(self._buffer))
+            s3_client.complete_multipart_upload(
+                Bucket=self.bucket, Key=self.key, UploadId=self._upload_id,
+                MultipartUpload={'Parts': self._parts}
+            )
+        self._buffer = bytearray()
+
+    def abort(self):
+        if self._upload_id is not None:
+            s3_client.abort_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self._upload_id)
+        self._buffer = bytearray()
+
+def delete_s3_keys(keys):
+    # delete_objects accepts at most 1000 keys per call
+    for i in range(0, len(keys), 1000):
+        s3_client.delete_objects(
+            Bucket=S3_BUCKET_NAME,
+            Delete={'Objects': [{'Key': key} for key in keys[i:i + 1000]], 'Quiet': True}
+        )
+
+def stream_multipart_to_s3(s3_key_for, max_files=UPLOAD_MAX_FILES, max_file_bytes=UPLOAD_MAX_FILE_BYTES):
+    """Parse the multipart request body incrementally, piping every file part into S3.
+
+    `s3_key_for(filename)` picks the destination key for each file. Returns the plain
+    form fields and a list of uploaded files. If a size or count limit is hit, the
+    in-flight upload is aborted and files already written are deleted before
+    UploadLimitExceeded is raised.
+    """
+    boundary = request.mimetype_params.get('boundary')
+    if request.mimetype != 'multipart/form-data' or not boundary:
+        raise ValueError("Expected a multipart/form-data request.")
+
+    decoder = MultipartDecoder(boundary.encode('latin-1'))
+    fields = MultiDict()
+    uploaded = []
+    field_name, field_value = None, None
+    current = None
+    batch_bytes = 0
+
+    try:
+        while True:
+            event = decoder.next_event()
+            if isinstance(event, NeedData):
+                chunk = request.stream.read(UPLOAD_READ_CHUNK_BYTES)
+                decoder.receive_data(chunk or None)
+            elif isinstance(event, Field):
+                field_name, field_value = event.name, bytearray()
+            elif isinstance(event, File):
+                filename = os.path.basename(event.filename or '')
+                if not filename:
+                    current = None  # empty file input, nothing to store
+                    continue
+                if len(uploaded) >= max_files:
+                    raise UploadLimitExceeded(f"A batch may contain at most {max_files} files.")
+                current = S3StreamingUpload(S3_BUCKET_NAME, s3_key_for(filename), filename)
+            elif isinstance(event, Data):
+                if field_value is not None:
+                    field_value += event.data
+                    if len(field_value) > UPLOAD_MAX_FIELD_BYTES:
+                        raise UploadLimitExceeded(f"Form field '{field_name}' is too large.")
+                    if not event.more_data:
+                        fields.add(field_name, field_value.decode('utf-8'))
+                        field_name, field_value = None, None
+                elif current is not None:
+                    batch_bytes += len(event.data)
+                    if current.size + len(event.data) > max_file_bytes:
+                        raise UploadLimitExceeded(f"'{current.filename}' exceeds the {max_file_bytes} byte file limit.")
+                    if batch_bytes > UPLOAD_MAX_BATCH_BYTES:
+                        raise UploadLimitExceeded(f"Batch exceeds the {UPLOAD_MAX_BATCH_BYTES} byte limit.")
+                    current.write(event.data)
+                    if not event.more_data:
+                        current.complete()
+                        uploaded.append(current.describe())
+                        print(f"  - Uploaded resume to: {current.key}")
+                        current = None
+            elif isinstance(event, Epilogue):
+                break
+    except Exception:
+        if current is not None:
+            current.abort()
+        delete_s3_keys([f['key'] for f in uploaded])
+        raise
+
+    return fields, uploaded
+
+# --- Archive ingest helpers ---
+class S3RangeReader(io.RawIOBase):
+    """Seekable, read-only view of an S3 object backed by ranged GETs."""
+
+    def __init__(self, bucket, key, size):
+        self.bucket = bucket
+        self.key = key
+        self.size = size
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        else:
+            self._pos = self.size + offset
+        return self._pos
+
+    def readinto(self, buffer):
+        if self._pos >= self.size:
+            return 0
+        end = min(self._pos + len(buffer), self.size) - 1
+        response = s3_client.get_object(Bucket=self.bucket, Key=self.key, Range=f"bytes={self._pos}-{end}")
+        data = response['Body'].read()
+        buffer[:len(data)] = data
+        self._pos += len(data)
+        return len(data)
+
+def open_s3_zip(key, size):
+    reader = io.BufferedReader(S3RangeReader(S3_BUCKET_NAME, key, size), buffer_size=ARCHIVE_READ_BUFFER_BYTES)
+    return zipfile.ZipFile(reader)
+
+def is_supported_resume(filename):
+    return filename.lower().endswith(SUPPORTED_RESUME_EXTENSIONS)
+
+def is_shared_archive_key(key):
+    # Keys a caller may name: under the archives folder, outside the staging area, no '..'
+    return (isinstance(key, str) and key.startswith(S3_ARCHIVES_FOLDER)
+            and not key.startswith(S3_STAGED_ARCHIVES_FOLDER) and '..' not in key.split('/'))
+
+def list_archive_resumes(archive_key):
+    """Pick the supported resumes in a ZIP stored in S3 from its central directory alone.
+
+    Returns (size, entries, skipped_count), so the batch can be admitted for its real
+    resume count before anything is extracted.
+    """
+    size = s3_client.head_object(Bucket=S3_BUCKET_NAME, Key=archive_key)['ContentLength']
+    entries = []
+    skipped = 0
+    with open_s3_zip(archive_key, size) as archive:
+        for info in archive.infolist():
+            filename = os.path.basename(info.filename)
+            if info.is_dir() or info.filename.startswith('__MACOSX/') or filename.startswith('.'):
+                continue
+            if not is_supported_resume(filename) or info.file_size > UPLOAD_MAX_FILE_BYTES:
+                skipped += 1
+                continue
+            entries.append(info)
+
+    if len(entries) > ARCHIVE_MAX_ENTRIES:
+        raise UploadLimitExceeded(f"An archive may contain at most {ARCHIVE_MAX_ENTRIES} resumes.")
+    return size, entries, skipped
+
+def extract_archive_resumes(archive_key, size, entries, s3_key_for):
+    """Extract the entries picked by list_archive_resumes into the batch.
+
+    The entries are split into contiguous runs and streamed to S3 by ARCHIVE_INGEST_WORKERS
+    threads, each holding its own archive handle so reads stay sequential. Returns the
+    uploaded files. If any entry fails, everything written for the batch is deleted and
+    the error is raised.
+    """
+    entries = sorted(entries, key=lambda info: info.header_offset)
+    run_length = max(1, -(-len(entries) // ARCHIVE_INGEST_WORKERS))
+    runs = [entries[i:i + run_length] for i in range(0, len(entries), run_length)]
+    uploaded = []
+
+    def extract_run(run):
+        with open_s3_zip(archive_key, size) as archive:
+            for info in run:
+                filename = os.path.basename(info.filename)
+                upload = S3StreamingUpload(S3_BUCKET_NAME, s3_key_for(filename), filename)
+                try:
+                    with archive.open(info) as source:
+                        while True:
+                            data = source.read(UPLOAD_READ_CHUNK_BYTES)
+                            if not data:
+                                break
+                            # file_size comes from the archive itself, so enforce the limit on real bytes too
+                            if upload.size + len(data) > UPLOAD_MAX_FILE_BYTES:
+                                raise UploadLimitExceeded(f"'{filename}' exceeds the {UPLOAD_MAX_FILE_BYTES} byte file limit.")
+                            upload.write(data)
+                    upload.complete()
+                except Exception:
+                    upload.abort()
+                    raise
+                uploaded.append(upload.describe())
+
+    with ThreadPoolExecutor(max_workers=ARCHIVE_INGEST_WORKERS) as executor:
+        futures = [executor.submit(extract_run, run) for run in runs]
+        errors = [future.exception() for future in futures if future.exception() is not None]
+
+    if errors:
+        delete_s3_keys([f['key'] for f in uploaded])
+        raise errors[0]
+
+    print(f"  - Extracted {len(uploaded)} resumes from {archive_key}")
+    return uploaded
+
+# --- Job description preprocessing helpers ---
+JD_BULLET_RE = re.compile(r'^\s*(?:[-*\u2022\u25aa\u25cf]|\d+[.)])\s+')
+JD_TOKEN_RE = re.compile(r'[a-z][a-z0-9+#./-]*')
+JD_YEARS_RE = re.compile(r'(\d{1,2})\s*\+?\s*(?:years|yrs)', re.IGNORECASE)
+
+def extract_jd_text(key, body):
+    """Plain text of a .pdf, .docx or text JD, or None for a format that cannot be read (e.g. .doc)."""
+    ext = os.path.splitext(key)[1].lower()
+    if ext == '.pdf':
+        return '\n'.join(page.extract_text() or '' for page in PdfReader(io.BytesIO(body)).pages)
+    if ext == '.docx':
+        with zipfile.ZipFile(io.BytesIO(body)) as docx:
+            xml = docx.read('word/document.xml').decode('utf-8')
+        return html.unescape(re.sub(r'<[^>]+>', '', xml.replace('</w:p>', '\n')))
+    if ext in JD_TEXT_EXTENSIONS:
+        return body.decode('utf-8', errors='replace')
+    return None
+
+def preprocess_jd(text):
+    """Turn raw JD text into requirements, skills, experience asks and a normalized term vector."""
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    requirements = [JD_BULLET_RE.sub('', line) for line in lines if JD_BULLET_RE.match(line)]
+
+    lowered = text.lower()
+    tokens = [token.rstrip('.-/') for token in JD_TOKEN_RE.findall(lowered)]
+    tokens = [token for token in tokens if len(token) > 1 and token not in JD_STOPWORDS]
+    token_set = set(tokens)
+    skills = set()
+    for skill in JD_SKILL_VOCABULARY:
+        if skill in JD_CONTEXT_SKILLS:
+            if re.search(r'(?<!\w)(?:' + JD_CONTEXT_SKILLS[skill] + r')(?!\w)', lowered):
+                skills.add(skill)
+        elif skill.isalpha():
+            if skill in token_set:
+                skills.add(skill)
+        elif re.search(r'(?<!\w)' + re.escape(skill) + r'(?!\w)', lowered):
+            skills.add(skill)
+
+    counts = Counter(tokens).most_common(JD_TERM_VECTOR_SIZE)
+    norm = math.sqrt(sum(count * count for _, count in counts)) or 1.0
+    # Each "N years" mention is reported with its line; a JD can ask for different amounts
+    # of experience with different things, so no single figure is derived from them
+    experience = [
+        {'years': int(match), 'requirement': JD_BULLET_RE.sub('', line)}
+        for line in lines for match in JD_YEARS_RE.findall(line)
+    ]
+
+    return {
+        'requirements': requirements,
+        'skills': sorted(skills),
+        'experienceRequirements': experience,
+        'termVector': {term: round(count / norm, 4) for term, count in counts}
+    }
+
+class JDProfileCache:
+    """LRU cache of preprocessed job descriptions keyed by S3 key and ETag.
+
+    Every lookup confirms the current ETag with a HEAD request, so an edited JD is
+    reprocessed automatically and its stale entry replaced. Only JD_CACHE_MAX_ENTRIES
+    profiles are kept; the least recently used one is evicted first. A JD in a format
+    extract_jd_text cannot read has no profile (None).
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (etag, profile)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        etag = s3_client.head_object(Bucket=S3_BUCKET_NAME, Key=key)['ETag']
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached[0] == etag:
+                self._entries.move_to_end(key)
+                return cached[1]
+
+        # IfMatch makes sure the body we parse is the version whose ETag we cache it under
+        response = s3_client.get_object(Bucket=S3_BUCKET_NAME, Key=key, IfMatch=etag)
+        text = extract_jd_text(key, response['Body'].read())
+        if text is None:
+            profile = None
+            print(f"  - Unsupported job description format, not preprocessed: {key}")
+        else:
+            profile = {'key': key, 'etag': etag, **preprocess_jd(text)}
+            print(f"  - Preprocessed job description: {key}")
+
+        with self._lock:
+            self._entries[key] = (etag, profile)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return profile
+
+jd_profile_cache = JDProfileCache(JD_CACHE_MAX_ENTRIES)
+
+def jd_profiles_for(jd_keys):
+    profiles = {}
+    for key in jd_keys:
+        try:
+            profiles[key] = jd_profile_cache.get(key)
+        except Exception as e:
+            # The workflow can still fall back to reading the raw JD itself
+            print(f"Error preprocessing job description {key}: {e}")
+            profiles[key] = None
+    return profiles
+
+# --- Admission control helpers ---
+class AdmissionRejected(Exception):
+    def __init__(self, message, retry_after=ADMISSION_RETRY_AFTER_SECONDS):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class AdmissionController:
+    """Per-user and global limits on in-flight batches and the files they queue.
+
+    When capacity is short a request waits up to ADMISSION_WAIT_SECONDS. Freed capacity
+    goes to the waiting request whose user has the fewest batches in flight (oldest
+    first on ties), so one recruiter's burst cannot starve everyone else. Requests that
+    are still waiting at the deadline are rejected with a Retry-After hint.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._batches = {}  # batch_id -> {'user', 'files', 'admitted', 'expires'}
+        self.batch_ttl = ADMISSION_BATCH_TTL_SECONDS
+        self._waiting = []  # [user, files, arrival] for requests waiting on capacity
+        self._arrivals = itertools.count()
+
+    def _purge_expired(self):
+        now = time.monotonic()
+        for batch_id in [b for b, ticket in self._batches.items() if ticket['expires'] <= now]:
+            del self._batches[batch_id]
+
+    def _usage(self, user, exclude=None):
+        tickets = [t for b, t in self._batches.items() if b != exclude]
+        user_tickets = [t for t in tickets if t['user'] == user]
+        return (len(user_tickets), sum(t['files'] for t in user_tickets),
+                len(tickets), sum(t['files'] for t in tickets))
+
+    def _shortfall(self, user, files, exclude=None):
+        # Returns the first limit the request would break, or None if it fits
+        user_batches, user_files, total_batches, total_files = self._usage(user, exclude)
+        if exclude is None and user_batches >= ADMISSION_MAX_BATCHES_PER_USER:
+            return f"You already have {user_batches} batches in progress."
+        if exclude is None and total_batches >= ADMISSION_MAX_BATCHES:
+            return "The scanner is processing the maximum number of batches."
+        if user_files + files > ADMISSION_MAX_FILES_PER_USER:
+            return f"You may have at most {ADMISSION_MAX_FILES_PER_USER} resumes queued."
+        if total_files + files > ADMISSION_MAX_FILES:
+            return "Too many resumes are queued for analysis."
+        return None
+
+    def _is_next(self, entry):
+        candidates = [e for e in self._waiting if self._shortfall(e[0], e[1]) is None]
+        if not candidates:
+            return False
+        return min(candidates, key=lambda e: (self._usage(e[0])[0], e[2])) is entry
+
+    @staticmethod
+    def _check_batch_size(files):
+        max_files = min(ADMISSION_MAX_FILES_PER_USER, ADMISSION_MAX_FILES)
+        if files > max_files:
+            # Can never be admitted, so retrying would not help
+            raise AdmissionRejected(f"A batch may queue at most {max_files} resumes.", retry_after=None)
+
+    def admit(self, batch_id, user, files):
+        self._check_batch_size(files)
+        deadline = time.monotonic() + ADMISSION_WAIT_SECONDS
+        entry = [user, files, next(self._arrivals)]
+        with self._cond:
+            self._waiting.append(entry)
+            try:
+                while True:
+                    self._purge_expired()
+                    if self._is_next(entry):
+                        now = time.monotonic()
+                        self._batches[batch_id] = {
+                            'user': user, 'files': files, 'admitted': now, 'expires': now + self.batch_ttl
+                        }
+                        return
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise AdmissionRejected(self._shortfall(user, files) or "Other submissions are ahead in the queue.")
+                    # Wake at least once a second so expired batches are noticed
+                    self._cond.wait(min(remaining, 1.0))
+            finally:
+                self._waiting.remove(entry)
+                self._cond.notify_all()
+
+    def resize(self, batch_id, files):
+        """Replace a batch's declared file count with the real one once it is known."""
+        self._check_batch_size(files)
+        with self._cond:
+            ticket = self._batches.get(batch_id)
+            if ticket is None:
+                return
+            reason = self._shortfall(ticket['user'], files, exclude=batch_id)
+            if reason is not None:
+                raise AdmissionRejected(reason)
+            ticket['files'] = files
+            self._cond.notify_all()
+
+    def release(self, batch_id):
+        with self._cond:
+            if self._batches.pop(batch_id, None) is not None:
+                self._cond.notify_all()
+
+    def limit_batch_ttl(self, seconds):
+        """Cap how long any batch, current or future, may hold its slot."""
+        with self._cond:
+            self.batch_ttl = min(self.batch_ttl, seconds)
+            for ticket in self._batches.values():
+                ticket['expires'] = min(ticket['expires'], ticket['admitted'] + seconds)
+            self._cond.notify_all()
+
+admission = AdmissionController()
+
+def submitter_id():
+    # The upload page has no login; it sends a per-browser X-User-Id, which is self-declared.
+    # Other clients that omit it share one quota per client address.
+    return request.headers.get('X-User-Id') or request.remote_addr or 'anonymous'
+
+def rejection_response(error):
+    body = {"error": str(error)}
+    headers = {}
+    if error.retry_after is not None:
+        body["retryAfter"] = error.retry_after
+        headers['Retry-After'] = str(error.retry_after)
+    return jsonify(body), 429, headers
+
+def admission_controlled(view):
+    """Admit the submission before its body is read and pass the view its batch_id.
+
+    The declared X-File-Count (if any) is reserved up front; views call
+    admission.resize once the real count is known. The slot is released again
+    unless the view reports success. An outer decorator may pass in the batch_id.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, batch_id=None, **kwargs):
+        batch_id = batch_id or new_batch_id()
+        declared = request.headers.get('X-File-Count', '')
+        try:
+            admission.admit(batch_id, submitter_id(), int(declared) if declared.isdigit() else 0)
+        except AdmissionRejected as e:
+            print(f"Rejected submission from {submitter_id()}: {e}")
+            return rejection_response(e)
+        # Completion is seen through the table stream, so it must be followed from now on
+        ensure_results_stream()
+        try:
+            response = view(*args, batch_id=batch_id, **kwargs)
+        except Exception:
+            admission.release(batch_id)
+            raise
+        if not isinstance(response, tuple) or response[1] != 200:
+            admission.release(batch_id)
+        return response
+    return wrapper
+
+# --- Idempotency helpers ---
+class IdempotencyStore:
+    """Local, TTL-bound record of submissions by (submitter, endpoint, Idempotency-Key).
+
+    A key is claimed, together with the batch ID its request will use, while the request
+    runs, so a concurrent retry can be pointed at that batch. Only successful responses
+    are kept; a failed request frees its key for a retry.
+    """
+
+    def __init__(self, ttl, max_entries):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # scope -> {'state', 'batch_id', 'body', 'status', 'expires'}
+        self._lock = threading.Lock()
+
+    def _purge_expired(self):
+        now = time.monotonic()
+        while self._entries:
+            scope, entry = next(iter(self._entries.items()))
+            if entry['expires'] > now:
+                break
+            del self._entries[scope]
+
+    def claim(self, scope, batch_id):
+        """Return the existing entry for scope, or None after claiming it for batch_id."""
+        with self._lock:
+            self._purge_expired()
+            entry = self._entries.get(scope)
+            if entry is not None:
+                return entry
+            self._entries[scope] = {'state': 'in_progress', 'batch_id': batch_id,
+                                    'expires': time.monotonic() + self.ttl}
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return None
+
+    def complete(self, scope, body, status):
+        with self._lock:
+            # Re-insert so entries stay ordered by expiry
+            self._entries.pop(scope, None)
+            self._entries[scope] = {
+                'state': 'completed', 'body': body, 'status': status,
+                'expires': time.monotonic() + self.ttl
+            }
+
+    def release(self, scope):
+        with self._lock:
+            self._entries.pop(scope, None)
+
+idempotency_store = IdempotencyStore(IDEMPOTENCY_TTL_SECONDS, IDEMPOTENCY_MAX_ENTRIES)
+
+def idempotent(view):
+    """Replay the original response when a submission is retried with the same Idempotency-Key."""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get('Idempotency-Key')
+        if not key:
+            return view(*args, **kwargs)
+        if len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+            return jsonify({"error": f"Idempotency-Key may be at most {IDEMPOTENCY_KEY_MAX_LENGTH} characters."}), 400
+
+        # The batch ID is fixed before the key is claimed, so a retry that arrives while the
+        # first request is still uploading can already be told which batch it started
+        scope = (submitter_id(), request.path, key)
+        batch_id = new_batch_id()
+        entry = idempotency_store.claim(scope, batch_id)
+        if entry is not None:
+            if entry['state'] == 'in_progress':
+                return jsonify({"message": "This submission is still being processed.",
+                                "batchId": entry['batch_id'], "status": "in_progress"}), 202, {'Retry-After': '5'}
+            print(f"Replaying response for Idempotency-Key {key}")
+            return jsonify(entry['body']), entry['status'], {'Idempotent-Replayed': 'true'}
+
+        try:
+            response = view(*args, batch_id=batch_id, **kwargs)
+        except Exception:
+            idempotency_store.release(scope)
+            raise
+        if isinstance(response, tuple) and response[1] == 200:
+            idempotency_store.complete(scope, response[0].get_json(), response[1])
+        else:
+            idempotency_store.release(scope)
+        return response
+    return wrapper
+
+# --- Batch layout helpers ---
+def new_batch_id():
+    # The random suffix keeps batches started in the same second apart
+    return f"batch-{int(time.time())}-{uuid.uuid4().hex[:8]}"
+
+def batch_prefix(batch_id):
+    return f"{S3_RESUMES_FOLDER}{batch_id}/"
+
+def batch_manifest_key(batch_id):
+    return f"{S3_MANIFESTS_FOLDER}{batch_id}.json"
+
+def batch_key_allocator(batch_id):
+    """Return an s3_key_for(filename) that hands out unique keys under the batch prefix.
+
+    Same-named files within one batch get a numeric suffix (resume.pdf, resume-2.pdf)
+    instead of overwriting each other. Safe to call from the archive ingest workers.
+    """
+    prefix = batch_prefix(batch_id)
+    used = set()
+    lock = threading.Lock()
+
+    def s3_key_for(filename):
+        stem, ext = os.path.splitext(filename)
+        with lock:
+            candidate, n = filename, 1
+            while candidate in used:
+                n += 1
+                candidate = f"{stem}-{n}{ext}"
+            used.add(candidate)
+        return prefix + candidate
+
+    return s3_key_for
+
+def requested_jd_keys(fields):
+    """JD keys for a batch: repeated 'jd_key' form fields, or 'jd_keys'/'jd_key' in JSON.
+
+    Raises ValueError if the JSON body is not an object, if a value is not a string or a
+    list of strings, if a key is not under S3_JD_FOLDER, or if more than MAX_JDS_PER_BATCH
+    are requested.
+    """
+    if not isinstance(fields, (MultiDict, dict)):
+        raise ValueError("Request body must be a JSON object or form fields.")
+    if isinstance(fields, MultiDict):
+        keys = fields.getlist('jd_key')
+    else:
+        keys = fields.get('jd_keys') or fields.get('jd_key')
+        if isinstance(keys, str) or keys is None:
+            keys = [keys]
+        if not isinstance(keys, list) or not all(key is None or isinstance(key, str) for key in keys):
+            raise ValueError("jd_keys must be a list of job description keys.")
+    # Drop blanks and duplicates but keep the order the recruiter picked them in
+    keys = list(dict.fromkeys(key for key in keys if key))
+    if not all(key.startswith(S3_JD_FOLDER) and '..' not in key.split('/') for key in keys):
+        raise ValueError(f"Job description keys must be under '{S3_JD_FOLDER}'.")
+    if len(keys) > MAX_JDS_PER_BATCH:
+        raise ValueError(f"A batch may be scored against at most {MAX_JDS_PER_BATCH} job descriptions.")
+    return keys
+
+def write_batch_manifest(batch_id, jd_keys, uploaded):
+    resumes = sorted(uploaded, key=lambda f: f['key'])
+    manifest = {
+        'batchId': batch_id,
+        'jobDescriptionKeys': jd_keys,
+        'createdAt': int(time.time()),
+        'prefix': batch_prefix(batch_id),
+        'count': len(resumes),
+        'totalBytes': sum(f['size'] for f in resumes),
+        'resumes': resumes
+    }
+    s3_client.put_object(
+        Bucket=S3_BUCKET_NAME,
+        Key=batch_manifest_key(batch_id),
+        Body=json.dumps(manifest).encode('utf-8'),
+        ContentType='application/json'
+    )
+    print(f"  - Wrote manifest for {len(resumes)} resumes to: {batch_manifest_key(batch_id)}")
+
+def trigger_analysis(batch_id, jd_keys):
+    # One run per batch: each resume is parsed once and scored against every listed JD,
+    # writing one Resume_Matches item per (ResumeID, JDID) pair
+    print(f"Triggering n8n workflow for batch: {batch_id} against {len(jd_keys)} JD(s)...")
+    webhook_payload = {
+        'batchId': batch_id,
+        'jobDescriptionKey': jd_keys[0],
+        'jobDescriptionKeys': jd_keys,
+        'resumesPrefix': batch_prefix(batch_id),
+        'manifestKey': batch_manifest_key(batch_id),
+        'jobDescriptionProfiles': jd_profiles_for(jd_keys)
+    }
+    response = requests.post(N8N_WEBHOOK_URL, json=webhook_payload)
+    response.raise_for_status()
+    print("n8n workflow triggered successfully.")
+
+def start_batch(batch_id, jd_keys, resumes, **details):
+    """Shared tail of the submission views, once the batch's resumes are in S3.
+
+    Confirms the admission reservation for the real resume count, writes the manifest and
+    triggers n8n. If any step fails, the batch's resumes and manifest are deleted again.
+    Returns the view's response; `details` are added to the success body.
+    """
+    try:
+        admission.resize(batch_id, len(resumes))
+    except AdmissionRejected as e:
+        delete_s3_keys([f['key'] for f in resumes])
+        return rejection_response(e)
+
+    print(f"All {len(resumes)} resumes for batch resumes successfully (JDs: {', '.join(jd_keys)}).")
+
+    # Record which keys belong to the batch so processing never has to guess
+    try:
+        write_batch_manifest(batch_id, jd_keys, resumes)
+    except Exception as e:
+        delete_s3_keys([f['key'] for f in resumes] + [batch_manifest_key(batch_id)])
+        return jsonify({"error": f"Failed to write batch manifest: {str(e)}"}), 500
+
+    # Trigger the n8n workflow, passing both Batch ID and the selected JD Keys
+    try:
+        trigger_analysis(batch_id, jd_keys)
+    except Exception as e:
+        print(f"Error triggering analysis for {batch_id}: {e}")
+        delete_s3_keys([f['key'] for f in resumes] + [batch_manifest_key(batch_id)])
+        return jsonify({"error": "Failed to trigger analysis workflow."}), 500
+
+    start_batch_tracking(batch_id, jd_keys, len(resumes) * len(jd_keys))
+    return jsonify({"message": "Successfully started analysis.", "batchId": batch_id, **details}), 200
+
+# --- Live result event helpers ---
+class EventBroker:
+    """In-process fan-out of result events to Server-Sent Events subscribers.
+
+    Recent events are kept so a reconnecting client can resume from its Last-Event-ID.
+    A subscriber that falls EVENT_SUBSCRIBER_QUEUE_SIZE events behind is dropped and
+    catches up from the history when it reconnects.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Millisecond start keeps IDs increasing across restarts of the service
+        self._next_id = int(time.time() * 1000)
+        self._history = deque(maxlen=EVENT_HISTORY_SIZE)
+        self._subscribers = set()
+
+    def publish(self, event_type, data):
+        with self._lock:
+            event = {'id': self._next_id, 'type': event_type, 'data': data}
+            self._next_id += 1
+            self._history.append(event)
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            try:
+                subscription.put_nowait(event)
+            except queue.Full:
+                self.unsubscribe(subscription)
+        return event
+
+    def subscribe(self, last_event_id=None):
+        subscription = queue.Queue(maxsize=EVENT_SUBSCRIBER_QUEUE_SIZE)
+        with self._lock:
+            if last_event_id is not None:
+                missed = [event for event in self._history if event['id'] > last_event_id]
+                for event in missed[-EVENT_SUBSCRIBER_QUEUE_SIZE:]:
+                    subscription.put_nowait(event)
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def is_subscribed(self, subscription):
+        with self._lock:
+            return subscription in self._subscribers
+
+event_broker = EventBroker()
+tracked_batches = OrderedDict()  # batch_id -> {'total': int, 'processed': set of (ResumeID, JDID)}
+tracked_batches_lock = threading.Lock()
+# Last published fields per (ResumeID, JDID), so an ingested result is not announced again by the stream
+published_results = OrderedDict()
+published_results_lock = threading.Lock()
+results_stream_started = False
+results_stream_lock = threading.Lock()
+
+def to_json_safe(value):
+    # DynamoDB numbers come back as Decimal, which json cannot serialize
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, dict):
+        return {k: to_json_safe(v) for k, v in value.items()}
+    if isinstance(value, (list, set)):
+        return [to_json_safe(v) for v in value]
+    return value
+
+def batch_id_for_item(item):
+    if item.get('BatchID'):
+        return item['BatchID']
+    # Fall back to the batch folder in the resume's S3 key or URL
+    for field in ('ResumeID', 'ResumeURL'):
+        value = str(item.get(field, ''))
+        if S3_RESUMES_FOLDER in value:
+            return value.split(S3_RESUMES_FOLDER, 1)[1].split('/', 1)[0] or None
+    return None
+
+def start_batch_tracking(batch_id, jd_keys, total):
+    # Tracking starts once n8n has accepted the batch, so count any result it already wrote
+    with published_results_lock:
+        processed = {key for key, candidate in published_results.items() if candidate['batchId'] == batch_id}
+    with tracked_batches_lock:
+        tracked_batches[batch_id] = {'total': total, 'processed': processed}
+        while len(tracked_batches) > TRACKED_BATCHES_LIMIT:
+            tracked_batches.popitem(last=False)
+    event_broker.publish('batch', {
+        'batchId': batch_id, 'jobDescriptionKeys': jd_keys,
+        'status': 'started', 'total': total, 'processed': len(processed)
+    })
+
+def publish_candidate_result(item):
+    item = to_json_safe(item)
+    batch_id = batch_id_for_item(item)
+    candidate = {'batchId': batch_id, **{field: item.get(field) for field in CANDIDATE_EVENT_FIELDS}}
+    result_key = (candidate['ResumeID'], candidate['JDID'])
+    with published_results_lock:
+        if published_results.get(result_key) == candidate:
+            return
+        published_results[result_key] = candidate
+        published_results.move_to_end(result_key)
+        while len(published_results) > EVENT_HISTORY_SIZE:
+            published_results.popitem(last=False)
+    event_broker.publish('candidate', candidate)
+
+    with tracked_batches_lock:
+        progress = tracked_batches.get(batch_id)
+        if progress is None:
+            return
+        progress['processed'].add((item.get('ResumeID'), item.get('JDID')))
+        processed, total = len(progress['processed']), progress['total']
+        if processed >= total:
+            del tracked_batches[batch_id]
+            admission.release(batch_id)
+    event_broker.publish('batch', {
+        'batchId': batch_id,
+        'status': 'completed' if processed >= total else 'processing',
+        'total': total, 'processed': processed
+    })
+
+def tail_results_stream():
+    """Follow the Resume_Matches DynamoDB stream and publish every written result.
+
+    Open shards are read from LATEST when the tailer starts; shards that appear later
+    (DynamoDB rolls shards every few hours) are read from TRIM_HORIZON so nothing written
+    after startup is missed.
+    """
+    try:
+        stream_arn = dynamodb_client.describe_table(TableName=RESULTS_TABLE_NAME)['Table'].get('LatestStreamArn')
+    except Exception as e:
+        print(f"Live results disabled, could not describe {RESULTS_TABLE_NAME}: {e}")
+        admission.limit_batch_ttl(ADMISSION_UNTRACKED_BATCH_TTL_SECONDS)
+        return
+    if not stream_arn:
+        print(f"Live results disabled: enable a NEW_IMAGE stream on {RESULTS_TABLE_NAME}.")
+        admission.limit_batch_ttl(ADMISSION_UNTRACKED_BATCH_TTL_SECONDS)
+        return
+
+    deserializer = TypeDeserializer()
+    iterators = {}
+    known_shards = set()
+    starting = True
+    next_discovery = 0
+
+    while True:
+        try:
+            if time.time() >= next_discovery:
+                shards, start_shard = [], None
+                while True:
+                    kwargs = {'StreamArn': stream_arn}
+                    if start_shard:
+                        kwargs['ExclusiveStartShardId'] = start_shard
+                    description = streams_client.describe_stream(**kwargs)['StreamDescription']
+                    shards.extend(description['Shards'])
+                    start_shard = description.get('LastEvaluatedShardId')
+                    if not start_shard:
+                        break
+                for shard in shards:
+                    shard_id = shard['ShardId']
+                    if shard_id in known_shards:
+                        continue
+                    known_shards.add(shard_id)
+                    closed = 'EndingSequenceNumber' in shard['SequenceNumberRange']
+                    if starting and closed:
+                        continue
+                    iterators[shard_id] = streams_client.get_shard_iterator(
+                        StreamArn=stream_arn, ShardId=shard_id,
+                        ShardIteratorType='LATEST' if starting else 'TRIM_HORIZON'
+                    )['ShardIterator']
+                starting = False
+                next_discovery = time.time() + RESULTS_STREAM_DISCOVERY_SECONDS
+
+            for shard_id, iterator in list(iterators.items()):
+                response = streams_client.get_records(ShardIterator=iterator, Limit=1000)
+                for record in response['Records']:
+                    image = record['dynamodb'].get('NewImage')
+                    if record['eventName'] in ('INSERT', 'MODIFY') and image:
+                        publish_candidate_result({k: deserializer.deserialize(v) for k, v in image.items()})
+                if response.get('NextShardIterator'):
+                    iterators[shard_id] = response['NextShardIterator']
+                else:
+                    del iterators[shard_id]  # shard closed; its children are picked up on discovery
+                    next_discovery = 0
+            time.sleep(RESULTS_STREAM_POLL_SECONDS)
+        except Exception as e:
+            print(f"Error reading results stream, restarting from LATEST: {e}")
+            iterators.clear()
+            known_shards.clear()
+            starting = True
+            next_discovery = 0
+            time.sleep(5)
+
+def ensure_results_stream():
+    global results_stream_started
+    with results_stream_lock:
+        if not results_stream_started:
+            results_stream_started = True
+            threading.Thread(target=tail_results_stream, name="results-stream", daemon=True).start()
+
+def format_sse(event):
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+
+# --- Result ingest helpers ---
+def validate_result(entry, batch_id):
+    """Check one posted result against the Resume_Matches schema.
+
+    Returns (item, None) with the item ready for DynamoDB, or (None, error message).
+    """
+    if not isinstance(entry, dict):
+        return None, "must be an object"
+    missing = [field for field in RESULT_REQUIRED_FIELDS if entry.get(field) in (None, '')]
+    if missing:
+        return None, f"missing {', '.join(missing)}"
+    unknown = set(entry) - set(RESULT_REQUIRED_FIELDS) - set(RESULT_TEXT_FIELDS) - {'BatchID'}
+    if unknown:
+        return None, f"unknown fields {', '.join(sorted(unknown))}"
+    if entry.get('BatchID', batch_id) != batch_id:
+        return None, "BatchID does not match the batch in the URL"
+
+    item = {'BatchID': batch_id}
+    for field in ('ResumeID', 'JDID') + RESULT_TEXT_FIELDS:
+        value = entry.get(field)
+        if value is None:
+            continue
+        if not isinstance(value, str) or len(value) > RESULT_TEXT_MAX_LENGTH:
+            return None, f"{field} must be a string of at most {RESULT_TEXT_MAX_LENGTH} characters"
+        item[field] = value
+
+    # The scorer sometimes sends the score as a numeric string; store it as a number either way
+    score = entry['Score']
+    if isinstance(score, bool) or not isinstance(score, (int, float, str)):
+        return None, "Score must be a number"
+    try:
+        score = Decimal(str(score).strip())
+    except ArithmeticError:
+        return None, "Score must be a number"
+    if not score.is_finite() or not 0 <= score <= 100:
+        return None, "Score must be between 0 and 100"
+    item['Score'] = score
+    return item, None
+
+def write_results(items):
+    """Write results in BatchWriteItem requests of 25.
+
+    The batch writer resends any UnprocessedItems, and a later entry for the same
+    (ResumeID, JDID) replaces an earlier one in the buffer, since DynamoDB rejects
+    duplicate keys within one request.
+    """
+    with results_table.batch_writer(overwrite_by_pkeys=['ResumeID', 'JDID']) as batch:
+        for item in items:
+            batch.put_item(Item=item)
 
 # --- Route to serve the HTML frontend ---
 @app.route("/")
@@ -41,46 +1162,508 @@ def get_jds():
         print(f"Error listing JDs: {e}")
         return jsonify({"error": "Could not list job descriptions from S3"}), 500
 
+# --- API Endpoint returning the cached, preprocessed form of a Job Description ---
+@app.route("/jd-profile")
+def jd_profile():
+    jd_key = request.args.get('key')
+    if not jd_key or not jd_key.startswith(S3_JD_FOLDER):
+        return jsonify({"error": f"A job description key under '{S3_JD_FOLDER}' is required."}), 400
+    try:
+        profile = jd_profile_cache.get(jd_key)
+    except Exception as e:
+        print(f"Error preprocessing job description {jd_key}: {e}")
+        return jsonify({"error": "Could not preprocess the job description."}), 500
+    if profile is None:
+        return jsonify({"error": "Job descriptions must be .pdf, .docx, .txt or .md files to be preprocessed."}), 415
+    return jsonify(profile)
+
 # --- API Endpoint for Uploading Resumes and Triggering n8n ---
 @app.route("/upload-and-trigger", methods=["POST"])
-def upload_and_trigger():
-    # 1. Get the selected JD key and resume files from the form data
-    jd_key = request.form.get('jd_key')
-    resume_files = request.files.getlist('resumes')
+@idempotent
+@admission_controlled
+def upload_and_trigger(batch_id):
+    # 1. Reject oversized batches before reading any of the body
+    if request.content_length and request.content_length > UPLOAD_MAX_BATCH_BYTES:
+        return jsonify({"error": f"Batch exceeds the {UPLOAD_MAX_BATCH_BYTES} byte limit."}), 413
 
-    if not jd_key or not resume_files:
+    # 2. The admission controller has already reserved a slot under a unique Batch ID
+    print(f"--- Starting new batch: {batch_id} ---")
+
+    try:
+        # 3. Stream the resumes straight from the request body into the batch's own 'pending' subfolder
+        fields, uploaded = stream_multipart_to_s3(batch_key_allocator(batch_id))
+    except UploadLimitExceeded as e:
+        return jsonify({"error": str(e)}), 413
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Failed to upload resumes to S3: {str(e)}"}), 500
+
+    try:
+        jd_keys = requested_jd_keys(fields)
+    except ValueError as e:
+        delete_s3_keys([f['key'] for f in uploaded])
+        return jsonify({"error": str(e)}), 400
+    if not jd_keys or not uploaded:
+        delete_s3_keys([f['key'] for f in uploaded])
         return jsonify({"error": "Job description and resumes are required."}), 400
 
-    # 2. Generate a unique Batch ID
-    batch_id = f"batch-{int(time.time())}"
-    print(f"--- Starting new batch: {batch_id} for JD: {jd_key} ---")
+    # 4. Manifest and n8n trigger
+    return start_batch(batch_id, jd_keys, uploaded)
+
+# --- API Endpoint for ingesting a ZIP archive of resumes and triggering n8n ---
+@app.route("/ingest-archive", methods=["POST"])
+@idempotent
+@admission_controlled
+def ingest_archive_and_trigger(batch_id):
+    # 1. Accept either an uploaded 'archive' file or the 'archive_key' of a ZIP already in S3
+    if request.content_length and request.content_length > UPLOAD_MAX_BATCH_BYTES:
+        return jsonify({"error": f"Archive exceeds the {UPLOAD_MAX_BATCH_BYTES} byte limit."}), 413
 
+    print(f"--- Starting new archive batch: {batch_id} ---")
+
+    staged = []
     try:
-        # 3. Upload all the resumes to a new 'pending' subfolder named after the batch
-        for resume in resume_files:
-            resume_s3_key = os.path.join(S3_RESUMES_FOLDER, resume.filename)
-            s3_client.upload_fileobj(resume, S3_BUCKET_NAME, resume_s3_key)
-            print(f"  - Uploaded resume to: {resume_s3_key}")
-        
-        print("All resumes for batch uploaded successfully.")
+        if request.mimetype == 'multipart/form-data':
+            fields, staged = stream_multipart_to_s3(
+                lambda filename: f"{S3_STAGED_ARCHIVES_FOLDER}{batch_id}.zip",
+                max_files=1, max_file_bytes=UPLOAD_MAX_BATCH_BYTES
+            )
+        else:
+            fields = request.get_json(silent=True) or request.form
+    except UploadLimitExceeded as e:
+        return jsonify({"error": str(e)}), 413
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
-        return jsonify({"error": f"Failed to upload resumes to S3: {str(e)}"}), 500
+        return jsonify({"error": f"Failed to upload archive to S3: {str(e)}"}), 500
+
+    try:
+        jd_keys = requested_jd_keys(fields)
+    except ValueError as e:
+        delete_s3_keys([f['key'] for f in staged])
+        return jsonify({"error": str(e)}), 400
+    archive_key = staged[0]['key'] if staged else fields.get('archive_key')
+    if not jd_keys or not archive_key:
+        delete_s3_keys([f['key'] for f in staged])
+        return jsonify({"error": "Job description and a ZIP archive are required."}), 400
+    if not staged and not is_shared_archive_key(archive_key):
+        return jsonify({"error": f"archive_key must be a key under '{S3_ARCHIVES_FOLDER}'."}), 400
 
-    # 4. Trigger the n8n workflow, passing both Batch ID and the selected JD Key
-    print(f"Triggering n8n workflow for batch: {batch_id}...")
+    # 2. Pick the resumes from the central directory and admit the batch for that count
+    #    before extracting anything
     try:
-        webhook_payload = {
-            'batchId': batch_id,
-            'jobDescriptionKey': jd_key 
+        try:
+            size, entries, skipped = list_archive_resumes(archive_key)
+            if not entries:
+                return jsonify({"error": "The archive contains no supported resumes (.pdf, .doc, .docx)."}), 400
+            admission.resize(batch_id, len(entries))
+            uploaded = extract_archive_resumes(archive_key, size, entries, batch_key_allocator(batch_id))
+        finally:
+            # The staged copy of an uploaded archive is only needed for extraction
+            delete_s3_keys([f['key'] for f in staged])
+    except AdmissionRejected as e:
+        return rejection_response(e)
+    except UploadLimitExceeded as e:
+        return jsonify({"error": str(e)}), 413
+    except zipfile.BadZipFile:
+        return jsonify({"error": "The archive is not a valid ZIP file."}), 400
+    except Exception as e:
+        return jsonify({"error": f"Failed to extract archive: {str(e)}"}), 500
+
+    # 3. Manifest and n8n trigger for the whole archive as one batch
+    print(f"  - {skipped} archive entries skipped")
+    return start_batch(batch_id, jd_keys, uploaded, uploaded=len(uploaded), skipped=skipped)
+
+# --- Resume download link helpers ---
+class PresignedUrlCache:
+    """Presigned S3 GET URLs per key, reused until RESUME_LINK_REFRESH_MARGIN_SECONDS
+    before they expire and evicted least-recently-used beyond RESUME_LINK_CACHE_MAX_ENTRIES."""
+
+    def __init__(self):
+        self._entries = OrderedDict()  # key -> (url, expires_at)
+        self._lock = threading.Lock()
+
+    def urls_for(self, keys):
+        now = time.time()
+        links, missing = {}, []
+        with self._lock:
+            for key in keys:
+                cached = self._entries.get(key)
+                if cached is not None and cached[1] - RESUME_LINK_REFRESH_MARGIN_SECONDS > now:
+                    self._entries.move_to_end(key)
+                    links[key] = cached
+                else:
+                    missing.append(key)
+
+        # Signing is local to boto3, so a whole page of links costs no S3 round trips
+        for key in missing:
+            url = s3_client.generate_presigned_url(
+                'get_object', Params={'Bucket': S3_BUCKET_NAME, 'Key': key},
+                ExpiresIn=RESUME_LINK_EXPIRY_SECONDS
+            )
+            links[key] = (url, now + RESUME_LINK_EXPIRY_SECONDS)
+
+        if missing:
+            with self._lock:
+                for key in missing:
+                    self._entries[key] = links[key]
+                    self._entries.move_to_end(key)
+                while len(self._entries) > RESUME_LINK_CACHE_MAX_ENTRIES:
+                    self._entries.popitem(last=False)
+        return links
+
+resume_links = PresignedUrlCache()
+
+def resume_key_from_reference(reference):
+    """Turn a stored ResumeID/ResumeURL (key, s3:// URI or bucket URL) into a resume key.
+
+    Returns None for anything outside this bucket's S3_RESUMES_FOLDER, so the link service
+    and proxy cannot be pointed at other objects such as batch manifests.
+    """
+    reference = str(reference or '').strip()
+    if reference.startswith('s3://'):
+        bucket, _, key = reference[5:].partition('/')
+        if bucket != S3_BUCKET_NAME:
+            return None
+    elif reference.startswith(('http://', 'https://')):
+        parsed = urlparse(reference)
+        path = unquote(parsed.path.lstrip('/'))
+        if parsed.netloc.startswith(S3_BUCKET_NAME + '.'):
+            key = path
+        elif path.startswith(S3_BUCKET_NAME + '/'):
+            key = path[len(S3_BUCKET_NAME) + 1:]
+        else:
+            return None
+    else:
+        key = reference
+    if not key.startswith(S3_RESUMES_FOLDER) or '..' in key.split('/'):
+        return None
+    return key
+
+def inline_disposition(filename):
+    """Content-Disposition for a stored filename, which may be any Unicode.
+
+    Headers must be Latin-1, so an ASCII fallback is sent alongside the RFC 5987
+    filename* form that current browsers prefer.
+    """
+    # Accents are dropped (é -> e); anything else outside plain ASCII becomes '_'
+    fallback = ''.join(c for c in unicodedata.normalize('NFKD', filename) if not unicodedata.combining(c))
+    fallback = re.sub(r'[^\w .()-]', '_', fallback, flags=re.ASCII).strip() or 'resume'
+    return f"inline; filename=\"{fallback}\"; filename*=UTF-8''{quote(filename, safe='')}"
+
+# --- Bulk presigned links for the resumes a dashboard is showing ---
+@app.route("/resume-links", methods=["POST"])
+def get_resume_links():
+    references = (request.get_json(silent=True) or {}).get('keys') or []
+    if (not isinstance(references, list) or len(references) > RESUME_LINKS_MAX_KEYS
+            or not all(isinstance(reference, str) for reference in references)):
+        return jsonify({"error": f"'keys' must be a list of at most {RESUME_LINKS_MAX_KEYS} resume keys or URLs."}), 400
+
+    keys = {reference: resume_key_from_reference(reference) for reference in references}
+    signed = resume_links.urls_for({key for key in keys.values() if key})
+    links = {}
+    for reference, key in keys.items():
+        if key is None:
+            continue
+        url, expires_at = signed[key]
+        links[reference] = {
+            'key': key,
+            'url': url,
+            'expiresAt': int(expires_at),
+            'downloadPath': f"/resumes/download?key={quote(key)}"
         }
-        response = requests.post(N8N_WEBHOOK_URL, json=webhook_payload)
-        response.raise_for_status()
-        
-        print("n8n workflow triggered successfully.")
-        return jsonify({"message": "Successfully started analysis.", "batchId": batch_id}), 200
-        
+    return jsonify({"links": links})
+
+# --- Range-capable download proxy for resumes ---
+@app.route("/resumes/download")
+def download_resume():
+    key = resume_key_from_reference(request.args.get('key'))
+    if key is None:
+        return jsonify({"error": f"A resume key under '{S3_RESUMES_FOLDER}' is required."}), 400
+
+    url, _ = resume_links.urls_for([key])[key]
+    upstream_headers = {}
+    for header in ('Range', 'If-Range', 'If-None-Match', 'If-Modified-Since'):
+        if request.headers.get(header):
+            upstream_headers[header] = request.headers[header]
+    try:
+        upstream = requests.get(url, headers=upstream_headers, stream=True, timeout=(5, 60))
     except Exception as e:
-        return jsonify({"error": "Failed to trigger analysis workflow."}), 500
+        print(f"Error fetching resume {key}: {e}")
+        return jsonify({"error": "Could not reach resume storage."}), 502
+
+    if upstream.status_code in (403, 404):
+        upstream.close()
+        return jsonify({"error": "Resume not found."}), 404
+    if upstream.status_code not in (200, 206, 304, 416):
+        upstream.close()
+        return jsonify({"error": "Could not fetch the resume."}), 502
+
+    headers = {'Accept-Ranges': 'bytes',
+               'Content-Disposition': inline_disposition(os.path.basename(key))}
+    for header in ('Content-Type', 'Content-Length', 'Content-Range', 'ETag', 'Last-Modified'):
+        if header in upstream.headers:
+            headers[header] = upstream.headers[header]
+
+    def body():
+        try:
+            yield from upstream.iter_content(RESUME_PROXY_CHUNK_BYTES)
+        finally:
+            upstream.close()
+
+    return Response(body(), status=upstream.status_code, headers=headers, direct_passthrough=True)
+
+# --- Candidate export helpers ---
+XLSX_ILLEGAL_CHARS_RE = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+class StreamSink:
+    """Write-only buffer that a streaming response drains after every chunk."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+def export_filters(args):
+    # Same semantics as the Manager dashboard: comma-separated terms match if any term is contained
+    def terms(name):
+        return [t.strip().lower() for t in args.get(name, '').split(',') if t.strip()]
+
+    return {
+        'min_score': float(args.get('min_score', 0)),
+        'max_score': float(args.get('max_score', 100)),
+        'exp_terms': terms('exp'),
+        'skill_terms': terms('skills'),
+        'jd_ids': [v for v in args.getlist('jdid') if v],
+        'statuses': [v for v in args.getlist('status') if v]
+    }
+
+def candidate_matches(item, filters):
+    try:
+        score = float(item.get('Score', 0))
+    except (TypeError, ValueError):
+        score = 0.0
+    if not filters['min_score'] <= score <= filters['max_score']:
+        return False
+    for field, terms in (('ExpMatch', filters['exp_terms']), ('SkillsMatch', filters['skill_terms'])):
+        value = item.get(field)
+        if terms and not (isinstance(value, str) and any(t in value.lower() for t in terms)):
+            return False
+    if filters['statuses'] and (item.get('Status') or 'Pending') not in filters['statuses']:
+        return False
+    return True
+
+def scan_filtered_candidates(filters):
+    """Yield matching Resume_Matches items page by page; never holds more than one page."""
+    kwargs = {
+        'Limit': EXPORT_PAGE_SIZE,
+        'ProjectionExpression': ', '.join(f"#c{i}" for i in range(len(EXPORT_COLUMNS))),
+        'ExpressionAttributeNames': {f"#c{i}": column for i, column in enumerate(EXPORT_COLUMNS)}
+    }
+    # JDID is an exact match, so DynamoDB can drop those rows before they are sent
+    if filters['jd_ids']:
+        kwargs['FilterExpression'] = Attr('JDID').is_in(filters['jd_ids'])
+    while True:
+        response = results_table.scan(**kwargs)
+        yield [item for item in response['Items'] if candidate_matches(item, filters)]
+        if 'LastEvaluatedKey' not in response:
+            return
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+def csv_safe(value):
+    value = to_json_safe(value)
+    # Resume-derived text must not be evaluated as a spreadsheet formula
+    if isinstance(value, str) and value[:1] in ('=', '+', '-', '@'):
+        return "'" + value
+    return '' if value is None else value
+
+def stream_candidates_csv(pages):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for page in pages:
+        for item in page:
+            writer.writerow([csv_safe(item.get(column)) for column in EXPORT_COLUMNS])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+def xlsx_cell(ref, value):
+    value = to_json_safe(value)
+    if value is None:
+        return ''
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f'<c r="{ref}"><v>{value}</v></c>'
+    text = xml_escape(XLSX_ILLEGAL_CHARS_RE.sub('', str(value)))
+    return f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+def xlsx_column_letter(index):
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+def stream_candidates_xlsx(pages):
+    """Write a minimal single-sheet workbook straight into the response.
+
+    zipfile can write to an unseekable sink, so the archive is emitted as each page of
+    rows is compressed instead of being assembled in memory or on disk.
+    """
+    sink = StreamSink()
+    columns = [xlsx_column_letter(i) for i in range(len(EXPORT_COLUMNS))]
+    ns = 'http://schemas.openxmlformats.org/'
+    with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED) as workbook:
+        workbook.writestr('[Content_Types].xml', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            f'<Types xmlns="{ns}package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            '</Types>'))
+        workbook.writestr('_rels/.rels', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            f'<Relationships xmlns="{ns}package/2006/relationships">'
+            f'<Relationship Id="rId1" Type="{ns}officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+            '</Relationships>'))
+        workbook.writestr('xl/workbook.xml', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            f'<workbook xmlns="{ns}spreadsheetml/2006/main" xmlns:r="{ns}officeDocument/2006/relationships">'
+            '<sheets><sheet name="Candidates" sheetId="1" r:id="rId1"/></sheets></workbook>'))
+        workbook.writestr('xl/_rels/workbook.xml.rels', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            f'<Relationships xmlns="{ns}package/2006/relationships">'
+            f'<Relationship Id="rId1" Type="{ns}officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+            '</Relationships>'))
+        yield sink.drain()
+
+        with workbook.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            header = ''.join(xlsx_cell(f"{col}1", name) for col, name in zip(columns, EXPORT_COLUMNS))
+            sheet.write((
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                f'<worksheet xmlns="{ns}spreadsheetml/2006/main"><sheetData>'
+                f'<row r="1">{header}</row>').encode('utf-8'))
+            row_number = 1
+            for page in pages:
+                rows = []
+                for item in page:
+                    row_number += 1
+                    cells = ''.join(xlsx_cell(f"{col}{row_number}", item.get(name))
+                                    for col, name in zip(columns, EXPORT_COLUMNS))
+                    rows.append(f'<row r="{row_number}">{cells}</row>')
+                sheet.write(''.join(rows).encode('utf-8'))
+                yield sink.drain()
+            sheet.write(b'</sheetData></worksheet>')
+    yield sink.drain()
+
+# --- Streaming export of filtered candidates (CSV or XLSX) ---
+@app.route("/export/candidates")
+def export_candidates():
+    export_format = request.args.get('format', 'csv').lower()
+    if export_format not in ('csv', 'xlsx'):
+        return jsonify({"error": "format must be 'csv' or 'xlsx'."}), 400
+    try:
+        filters = export_filters(request.args)
+    except ValueError:
+        return jsonify({"error": "min_score and max_score must be numbers."}), 400
+
+    pages = scan_filtered_candidates(filters)
+    filename = f"candidates-{time.strftime('%Y%m%d-%H%M%S')}.{export_format}"
+    if export_format == 'csv':
+        body = stream_candidates_csv(pages)
+        mimetype = 'text/csv'
+    else:
+        body = stream_candidates_xlsx(pages)
+        mimetype = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    return Response(stream_with_context(body), mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename="{filename}"'})
+
+# --- Scored results posted back by the analysis workflow ---
+@app.route("/batches/<batch_id>/results", methods=["POST"])
+def ingest_batch_results(batch_id):
+    if not RESULTS_INGEST_TOKEN:
+        return jsonify({"error": "Posting results is disabled until RESULTS_INGEST_TOKEN is set."}), 503
+    supplied = request.headers.get('Authorization', '').encode('utf-8')
+    if not hmac.compare_digest(supplied, f"Bearer {RESULTS_INGEST_TOKEN}".encode('utf-8')):
+        return jsonify({"error": "A valid results token is required."}), 401
+
+    payload = request.get_json(silent=True)
+    entries = payload.get('results') if isinstance(payload, dict) else payload
+    if not isinstance(entries, list) or not entries:
+        return jsonify({"error": "Body must be a non-empty JSON array of results."}), 400
+    if len(entries) > RESULTS_INGEST_MAX_ITEMS:
+        return jsonify({"error": f"At most {RESULTS_INGEST_MAX_ITEMS} results may be posted at once."}), 413
+
+    # Validate everything first so a bad entry never leaves the batch half written
+    items, errors = OrderedDict(), []
+    for index, entry in enumerate(entries):
+        item, error = validate_result(entry, batch_id)
+        if error:
+            errors.append({'index': index, 'error': error})
+        else:
+            items[(item['ResumeID'], item['JDID'])] = item
+    if errors:
+        return jsonify({"error": "Some results are invalid.", "invalid": errors[:RESULT_ERRORS_REPORTED],
+                        "invalidCount": len(errors)}), 400
+
+    try:
+        write_results(items.values())
+    except Exception as e:
+        return jsonify({"error": f"Failed to store results: {str(e)}"}), 500
+
+    # Progress, admission slots and live subscribers are updated now rather than when
+    # the same writes come back through the table stream
+    for item in items.values():
+        publish_candidate_result(item)
+    return jsonify({"message": "Results stored.", "batchId": batch_id, "written": len(items)}), 200
+
+# --- Server-Sent Events stream of batch progress and candidate results ---
+@app.route("/events")
+def events():
+    # Optional ?batchId= narrows the stream to one batch (used by the upload page)
+    batch_filter = request.args.get('batchId')
+    last_event_id = request.headers.get('Last-Event-ID', '')
+    ensure_results_stream()
+    if last_event_id.isdigit():
+        resume_from = int(last_event_id)
+    else:
+        # A batch subscriber replays the batch's recent history so early results are not missed
+        resume_from = 0 if batch_filter else None
+    subscription = event_broker.subscribe(resume_from)
+
+    def stream():
+        try:
+            yield "retry: 1000\n\n"
+            while True:
+                try:
+                    event = subscription.get(timeout=EVENT_HEARTBEAT_SECONDS)
+                except queue.Empty:
+                    if not event_broker.is_subscribed(subscription):
+                        return  # dropped for falling behind; the client reconnects and replays
+                    yield ": keep-alive\n\n"
+                    continue
+                if batch_filter and event['data'].get('batchId') != batch_filter:
+                    continue
+                yield format_sse(event)
+        finally:
+            event_broker.unsubscribe(subscription)
+
+    return Response(stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 # --- Main execution block ---
 if __name__ == "__main__":
@@ -0,0 +1,74 @@
+import io
+import os
+import sys
+
+import pytest
+
+# resume.py creates its boto3 clients at import time; the tests replace them before any call
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+os.environ.setdefault('AWS_ACCESS_KEY_ID', 'testing')
+os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'testing')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import resume  # noqa: E402
+
+
+class FakeS3:
+    """In-memory stand-in for the handful of S3 calls the upload helpers make."""
+
+    def __init__(self):
+        self.objects = {}
+        self.multipart = {}  # upload_id -> {'key', 'parts'}
+        self.aborted = []
+
+    def put_object(self, Bucket, Key, Body, **kwargs):
+        self.objects[Key] = Body if isinstance(Body, bytes) else Body.read()
+        return {'ETag': '"etag"'}
+
+    def create_multipart_upload(self, Bucket, Key, **kwargs):
+        upload_id = f"upload-{len(self.multipart) + 1}"
+        self.multipart[upload_id] = {'key': Key, 'parts': []}
+        return {'UploadId': upload_id}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self.multipart[UploadId]['parts'].append(Body)
+        return {'ETag': f'"part-{PartNumber}"'}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        upload = self.multipart.pop(UploadId)
+        self.objects[Key] = b''.join(upload['parts'])
+        return {}
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.multipart.pop(UploadId)
+        self.aborted.append(Key)
+        return {}
+
+    def head_object(self, Bucket, Key):
+        return {'ContentLength': len(self.objects[Key]), 'ETag': f'"{len(self.objects[Key])}"'}
+
+    def get_object(self, Bucket, Key, Range=None, **kwargs):
+        body = self.objects[Key]
+        if Range:
+            start, end = Range[len('bytes='):].split('-')
+            body = body[int(start):int(end) + 1]
+        return {'Body': io.BytesIO(body), 'ContentLength': len(body)}
+
+    def delete_objects(self, Bucket, Delete):
+        for obj in Delete['Objects']:
+            self.objects.pop(obj['Key'], None)
+        return {}
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    fake = FakeS3()
+    monkeypatch.setattr(resume, 's3_client', fake)
+    return fake
+
+
+@pytest.fixture
+def admission(monkeypatch):
+    controller = resume.AdmissionController()
+    monkeypatch.setattr(resume, 'admission', controller)
+    return controller
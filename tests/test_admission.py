@@ -0,0 +1,94 @@
+import threading
+import time
+
+import pytest
+
+import resume
+
+
+@pytest.fixture(autouse=True)
+def limits(monkeypatch):
+    monkeypatch.setattr(resume, 'ADMISSION_MAX_BATCHES', 2)
+    monkeypatch.setattr(resume, 'ADMISSION_MAX_BATCHES_PER_USER', 2)
+    monkeypatch.setattr(resume, 'ADMISSION_MAX_FILES', 100)
+    monkeypatch.setattr(resume, 'ADMISSION_MAX_FILES_PER_USER', 60)
+    monkeypatch.setattr(resume, 'ADMISSION_WAIT_SECONDS', 0)
+
+
+def test_per_user_batch_limit_is_rejected_with_retry_after(admission):
+    admission.admit('a1', 'alice', 1)
+    admission.admit('a2', 'alice', 1)
+    with pytest.raises(resume.AdmissionRejected, match='2 batches in progress') as rejected:
+        admission.admit('a3', 'alice', 1)
+    assert rejected.value.retry_after == resume.ADMISSION_RETRY_AFTER_SECONDS
+
+
+def test_batch_that_can_never_fit_has_no_retry_after(admission):
+    with pytest.raises(resume.AdmissionRejected) as rejected:
+        admission.admit('big', 'alice', 61)
+    assert rejected.value.retry_after is None
+
+
+def test_release_frees_the_slot(admission):
+    admission.admit('a1', 'alice', 1)
+    admission.admit('a2', 'alice', 1)
+    admission.release('a1')
+    admission.admit('a3', 'alice', 1)
+
+
+def test_resize_is_checked_against_file_limits(admission):
+    admission.admit('a1', 'alice', 0)
+    admission.resize('a1', 60)
+    admission.admit('b1', 'bob', 40)
+    with pytest.raises(resume.AdmissionRejected, match='Too many resumes'):
+        admission.resize('b1', 41)
+
+
+def test_resize_beyond_the_batch_cap_has_no_retry_after(admission):
+    admission.admit('a1', 'alice', 0)
+    with pytest.raises(resume.AdmissionRejected) as rejected:
+        admission.resize('a1', 61)
+    assert rejected.value.retry_after is None
+
+
+def test_limit_batch_ttl_expires_held_slots(admission):
+    admission.admit('a1', 'alice', 1)
+    admission.admit('a2', 'alice', 1)
+    admission.limit_batch_ttl(0)
+    admission.admit('a3', 'alice', 1)
+    assert admission.batch_ttl == 0
+
+
+def test_freed_capacity_goes_to_the_user_with_fewest_batches(admission, monkeypatch):
+    monkeypatch.setattr(resume, 'ADMISSION_WAIT_SECONDS', 1)
+    admission.admit('a1', 'alice', 1)
+    admission.admit('c1', 'carol', 1)
+    outcomes = {}
+
+    def submit(batch_id, user):
+        try:
+            admission.admit(batch_id, user, 1)
+            outcomes[user] = 'admitted'
+        except resume.AdmissionRejected:
+            outcomes[user] = 'rejected'
+
+    # Alice queues first but already has a batch in flight; Bob has none
+    waiters = [threading.Thread(target=submit, args=('a2', 'alice'))]
+    waiters[0].start()
+    time.sleep(0.1)
+    waiters.append(threading.Thread(target=submit, args=('b1', 'bob')))
+    waiters[1].start()
+    time.sleep(0.1)
+    admission.release('c1')
+    for waiter in waiters:
+        waiter.join()
+
+    assert outcomes == {'bob': 'admitted', 'alice': 'rejected'}
+
+
+def test_rejection_response_sets_retry_after_header():
+    with resume.app.app_context():
+        body, status, headers = resume.rejection_response(resume.AdmissionRejected('busy', retry_after=12))
+    assert status == 429
+    assert headers == {'Retry-After': '12'}
+    assert body.get_json() == {'error': 'busy', 'retryAfter': 12}
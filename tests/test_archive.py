@@ -0,0 +1,86 @@
+import io
+import zipfile
+
+import pytest
+
+import resume
+
+JD_KEY = 'job-descriptions/dev.pdf'
+
+
+@pytest.fixture
+def archive(s3):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as zf:
+        for name in ('a.pdf', 'b.docx', 'nested/c.pdf'):
+            zf.writestr(name, f"resume {name}")
+        zf.writestr('notes.txt', 'not a resume')
+        zf.writestr('__MACOSX/._a.pdf', 'metadata')
+    s3.objects['archives/team.zip'] = buffer.getvalue()
+    return 'archives/team.zip'
+
+
+@pytest.fixture
+def triggered(monkeypatch):
+    calls = []
+    monkeypatch.setattr(resume, 'trigger_analysis', lambda batch_id, jd_keys: calls.append((batch_id, jd_keys)))
+    monkeypatch.setattr(resume, 'ensure_results_stream', lambda: None)
+    return calls
+
+
+def batch_resumes(s3):
+    return sorted(key for key in s3.objects if key.startswith(resume.S3_RESUMES_FOLDER))
+
+
+def test_list_archive_resumes_reads_only_the_central_directory(s3, archive):
+    size, entries, skipped = resume.list_archive_resumes(archive)
+    assert size == len(s3.objects[archive])
+    assert sorted(info.filename for info in entries) == ['a.pdf', 'b.docx', 'nested/c.pdf']
+    assert skipped == 1
+
+
+def test_archive_is_extracted_into_one_batch(s3, archive, admission, triggered):
+    response = resume.app.test_client().post('/ingest-archive', json={'archive_key': archive, 'jd_keys': [JD_KEY]})
+
+    body = response.get_json()
+    assert response.status_code == 200
+    assert (body['uploaded'], body['skipped']) == (3, 1)
+    assert len(batch_resumes(s3)) == 3
+    assert triggered == [(body['batchId'], [JD_KEY])]
+
+
+def test_batch_over_the_admission_cap_is_rejected_before_extraction(s3, archive, admission, triggered, monkeypatch):
+    monkeypatch.setattr(resume, 'ADMISSION_MAX_FILES_PER_USER', 2)
+
+    response = resume.app.test_client().post('/ingest-archive', json={'archive_key': archive, 'jd_keys': [JD_KEY]})
+
+    assert response.status_code == 429
+    assert batch_resumes(s3) == []
+    assert triggered == []
+
+
+def test_archive_key_outside_the_archives_folder_is_rejected(s3, admission):
+    response = resume.app.test_client().post('/ingest-archive', json={'archive_key': 'resumes/pending/x.zip',
+                                                                      'jd_keys': [JD_KEY]})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('body', [[JD_KEY], JD_KEY, 42])
+def test_json_body_that_is_not_an_object_is_rejected(s3, admission, body):
+    response = resume.app.test_client().post('/ingest-archive', json=body)
+    assert response.status_code == 400
+
+
+def test_failed_trigger_removes_the_batch(s3, archive, admission, monkeypatch):
+    def fail(batch_id, jd_keys):
+        raise RuntimeError("webhook unavailable")
+    monkeypatch.setattr(resume, 'trigger_analysis', fail)
+    monkeypatch.setattr(resume, 'ensure_results_stream', lambda: None)
+    subscription = resume.event_broker.subscribe()
+
+    response = resume.app.test_client().post('/ingest-archive', json={'archive_key': archive, 'jd_keys': [JD_KEY]})
+
+    assert response.status_code == 500
+    assert list(s3.objects) == [archive]  # no resumes or manifest left behind
+    assert subscription.empty()
+    resume.event_broker.unsubscribe(subscription)
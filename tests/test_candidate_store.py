@@ -0,0 +1,71 @@
+from decimal import Decimal
+
+import pytest
+
+import dashboard_data
+
+
+class FakeTable:
+    def __init__(self, items):
+        self.items = items
+
+    def scan(self, **kwargs):
+        return {'Items': [dict(item) for item in self.items]}
+
+
+def row(resume_id, score, **fields):
+    return {'ResumeID': resume_id, 'JDID': 'job-descriptions/dev.pdf', 'Score': Decimal(score), **fields}
+
+
+def event(resume_id, score, **fields):
+    # Pushed results arrive as JSON, with a batchId and plain numbers
+    return {'batchId': 'batch-1', 'ResumeID': resume_id, 'JDID': 'job-descriptions/dev.pdf',
+            'Score': score, 'Status': None, **fields}
+
+
+@pytest.fixture
+def store():
+    store = dashboard_data.CandidateStore(FakeTable([row('a', 40, Status='Pending'), row('b', 70)]))
+    store.snapshot()
+    return store
+
+
+def test_merge_updates_existing_rows_and_appends_new_ones(store):
+    base = store.snapshot()
+
+    merged = store._merge(base, [event('a', 90), event('c', 55, Name='Carol')])
+
+    assert [item['ResumeID'] for item in merged.items] == ['a', 'b', 'c']
+    assert merged.items[0] == {'ResumeID': 'a', 'JDID': 'job-descriptions/dev.pdf', 'Score': 90,
+                               'Status': 'Pending'}
+    assert merged.index[('c', 'job-descriptions/dev.pdf')] == 2
+    assert list(merged.frame['Score']) == [90, 70, 55]
+    assert merged.frame.loc[2, 'Name'] == 'Carol'
+
+
+def test_merge_leaves_the_previous_snapshot_untouched(store):
+    base = store.snapshot()
+
+    store._merge(base, [event('a', 90), event('c', 55)])
+
+    assert len(base.items) == 2 and base.items[0]['Score'] == 40
+    assert ('c', 'job-descriptions/dev.pdf') not in base.index
+    assert list(base.frame['Score']) == [40, 70]
+
+
+def test_merge_ignores_results_without_a_key(store):
+    base = store.snapshot()
+    assert store._merge(base, [{'ResumeID': 'a', 'Score': 10}]) is base
+
+
+def test_merged_version_matches_a_rescan_of_the_same_rows(store):
+    merged = store._merge(store.snapshot(), [event('c', 55), event('a', 90)])
+
+    rescanned = [row('c', 55), row('b', 70), row('a', 90, Status='Pending')]
+    assert merged.version == dashboard_data.dataset_version(rescanned)
+    assert merged.version != store.snapshot().version
+
+
+def test_merging_an_unchanged_row_keeps_the_version(store):
+    base = store.snapshot()
+    assert store._merge(base, [event('b', 70)]).version == base.version
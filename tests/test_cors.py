@@ -0,0 +1,44 @@
+import pytest
+
+import resume
+
+ORIGIN = 'https://elsewhere.example'
+
+
+@pytest.fixture(autouse=True)
+def no_stream_reader(monkeypatch):
+    monkeypatch.setattr(resume, 'ensure_results_stream', lambda: None)
+
+
+def preflight(path, method='POST'):
+    return resume.app.test_client().options(path, headers={
+        'Origin': ORIGIN, 'Access-Control-Request-Method': method
+    })
+
+
+@pytest.mark.parametrize('path', ['/get-jds', '/upload-and-trigger', '/ingest-archive'])
+def test_submission_routes_allow_cross_origin_calls(path):
+    assert 'Access-Control-Allow-Origin' in preflight(path).headers
+
+
+@pytest.mark.parametrize('path, method', [
+    ('/events', 'GET'),
+    ('/export/candidates', 'GET'),
+    ('/resume-links', 'POST'),
+    ('/resumes/download', 'GET'),
+    ('/batches/b1/results', 'POST'),
+])
+def test_candidate_data_routes_are_same_origin_only(path, method):
+    assert 'Access-Control-Allow-Origin' not in preflight(path, method).headers
+
+
+class EmptyTable:
+    def scan(self, **kwargs):
+        return {'Items': []}
+
+
+def test_export_response_has_no_cross_origin_header(monkeypatch):
+    monkeypatch.setattr(resume, 'results_table', EmptyTable())
+    response = resume.app.test_client().get('/export/candidates', headers={'Origin': ORIGIN})
+    assert response.status_code == 200
+    assert 'Access-Control-Allow-Origin' not in response.headers
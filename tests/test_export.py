@@ -0,0 +1,80 @@
+import csv
+import io
+from decimal import Decimal
+
+import pytest
+from werkzeug.datastructures import MultiDict
+
+import resume
+
+
+class FakeTable:
+    def __init__(self, pages):
+        self.pages = pages
+        self.calls = []
+
+    def scan(self, **kwargs):
+        self.calls.append(kwargs)
+        page = kwargs.get('ExclusiveStartKey', 0)
+        response = {'Items': self.pages[page]}
+        if page + 1 < len(self.pages):
+            response['LastEvaluatedKey'] = page + 1
+        return response
+
+
+def candidate(resume_id, score, **fields):
+    return {'ResumeID': resume_id, 'JDID': 'job-descriptions/dev.pdf', 'Name': resume_id,
+            'Score': Decimal(score), **fields}
+
+
+def test_export_filters_parse_terms_and_repeated_values():
+    filters = resume.export_filters(MultiDict([
+        ('min_score', '50'), ('skills', ' Python, ,AWS '), ('status', 'Hired'), ('status', 'Reviewed')
+    ]))
+    assert filters['min_score'] == 50 and filters['max_score'] == 100
+    assert filters['skill_terms'] == ['python', 'aws']
+    assert filters['statuses'] == ['Hired', 'Reviewed']
+    with pytest.raises(ValueError):
+        resume.export_filters(MultiDict([('min_score', 'high')]))
+
+
+def test_candidate_matches_score_terms_and_status():
+    filters = resume.export_filters(MultiDict([('min_score', '60'), ('exp', 'senior'), ('status', 'Pending')]))
+    assert resume.candidate_matches(candidate('a', 75, ExpMatch='Senior engineer'), filters)
+    assert not resume.candidate_matches(candidate('b', 40, ExpMatch='Senior engineer'), filters)
+    assert not resume.candidate_matches(candidate('c', 75, ExpMatch='Junior'), filters)
+    assert not resume.candidate_matches(candidate('d', 75, ExpMatch='Senior', Status='Hired'), filters)
+
+
+def test_csv_export_streams_every_matching_page(monkeypatch):
+    table = FakeTable([
+        [candidate('a', 90), candidate('b', 10)],
+        [candidate('c', 80, Name='=cmd()')],
+    ])
+    monkeypatch.setattr(resume, 'results_table', table)
+
+    response = resume.app.test_client().get('/export/candidates?min_score=50&jdid=job-descriptions/dev.pdf')
+
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert response.status_code == 200
+    assert [row['ResumeID'] for row in rows] == ['a', 'c']
+    assert rows[1]['Name'] == "'=cmd()"
+    assert len(table.calls) == 2
+    assert 'FilterExpression' in table.calls[0]
+
+
+def test_xlsx_export_opens_as_a_workbook(monkeypatch):
+    openpyxl = pytest.importorskip('openpyxl')
+    monkeypatch.setattr(resume, 'results_table', FakeTable([[candidate('a', 90), candidate('b', 70)]]))
+
+    response = resume.app.test_client().get('/export/candidates?format=xlsx')
+
+    sheet = openpyxl.load_workbook(io.BytesIO(response.get_data())).active
+    rows = list(sheet.iter_rows(values_only=True))
+    assert rows[0][:2] == ('ResumeID', 'Name')
+    assert [row[0] for row in rows[1:]] == ['a', 'b']
+
+
+def test_unknown_format_is_rejected():
+    response = resume.app.test_client().get('/export/candidates?format=pdf')
+    assert response.status_code == 400
@@ -0,0 +1,90 @@
+import pytest
+from flask import Flask, jsonify
+
+import resume
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = resume.IdempotencyStore(ttl=60, max_entries=10)
+    monkeypatch.setattr(resume, 'idempotency_store', store)
+    return store
+
+
+@pytest.fixture
+def app():
+    # A stand-in submission endpoint, so the decorator is tested without S3 or n8n
+    app = Flask(__name__)
+    app.calls = []
+    app.status = 200
+
+    @app.route('/submit', methods=['POST'])
+    @resume.idempotent
+    def submit(batch_id=None):
+        app.calls.append(batch_id)
+        if app.status != 200:
+            return jsonify({"error": "failed"}), app.status
+        return jsonify({"batchId": batch_id}), 200
+
+    return app
+
+
+def post(app, key, user='alice'):
+    return app.test_client().post('/submit', headers={'Idempotency-Key': key, 'X-User-Id': user})
+
+
+def test_store_claim_complete_and_release():
+    store = resume.IdempotencyStore(ttl=60, max_entries=10)
+    assert store.claim('scope', 'batch-1') is None
+    entry = store.claim('scope', 'batch-2')
+    assert (entry['state'], entry['batch_id']) == ('in_progress', 'batch-1')
+    store.complete('scope', {'batchId': 'batch-1'}, 200)
+    assert store.claim('scope', 'batch-3')['body'] == {'batchId': 'batch-1'}
+    store.release('scope')
+    assert store.claim('scope', 'batch-4') is None
+
+
+def test_store_entries_expire():
+    store = resume.IdempotencyStore(ttl=0, max_entries=10)
+    store.claim('scope', 'batch-1')
+    assert store.claim('scope', 'batch-2') is None
+
+
+def test_retry_replays_the_original_response(store, app):
+    first = post(app, 'key-1')
+    retry = post(app, 'key-1')
+
+    assert retry.status_code == 200
+    assert retry.get_json() == first.get_json()
+    assert retry.headers['Idempotent-Replayed'] == 'true'
+    assert len(app.calls) == 1
+
+
+def test_keys_are_scoped_per_submitter(store, app):
+    post(app, 'key-1', user='alice')
+    post(app, 'key-1', user='bob')
+    assert len(app.calls) == 2
+
+
+def test_failed_request_releases_its_key(store, app):
+    app.status = 400
+    assert post(app, 'key-1').status_code == 400
+    app.status = 200
+    assert post(app, 'key-1').status_code == 200
+    assert len(app.calls) == 2
+
+
+def test_retry_during_first_request_gets_its_batch_id(store, app):
+    store.claim(('alice', '/submit', 'key-1'), 'batch-in-flight')
+
+    response = post(app, 'key-1')
+
+    assert response.status_code == 202
+    assert response.get_json()['batchId'] == 'batch-in-flight'
+    assert response.get_json()['status'] == 'in_progress'
+    assert app.calls == []
+
+
+def test_overlong_key_is_rejected(store, app):
+    response = post(app, 'k' * (resume.IDEMPOTENCY_KEY_MAX_LENGTH + 1))
+    assert response.status_code == 400
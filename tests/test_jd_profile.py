@@ -0,0 +1,30 @@
+import pytest
+
+import resume
+
+
+@pytest.fixture
+def cache(monkeypatch, s3):
+    cache = resume.JDProfileCache(max_entries=2)
+    monkeypatch.setattr(resume, 'jd_profile_cache', cache)
+    s3.objects['job-descriptions/dev.txt'] = b"- 5+ years of Python\n- REST API design\n"
+    s3.objects['job-descriptions/dev.doc'] = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1binary'
+    return cache
+
+
+def test_unsupported_format_has_no_text():
+    assert resume.extract_jd_text('job-descriptions/dev.doc', b'\xd0\xcf\x11\xe0') is None
+    assert resume.extract_jd_text('job-descriptions/dev.txt', b'Python') == 'Python'
+
+
+def test_profiles_are_none_for_unsupported_formats(cache):
+    profiles = resume.jd_profiles_for(['job-descriptions/dev.txt', 'job-descriptions/dev.doc'])
+    assert profiles['job-descriptions/dev.txt']['skills'] == ['python', 'rest']
+    assert profiles['job-descriptions/dev.doc'] is None
+
+
+def test_jd_profile_endpoint_rejects_unsupported_formats(cache):
+    client = resume.app.test_client()
+    assert client.get('/jd-profile?key=job-descriptions/dev.doc').status_code == 415
+    assert client.get('/jd-profile?key=job-descriptions/dev.txt').get_json()['requirements'] == [
+        '5+ years of Python', 'REST API design']
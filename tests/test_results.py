@@ -0,0 +1,102 @@
+import math
+from decimal import Decimal
+
+import pytest
+
+import resume
+
+TOKEN = 'ingest-secret'
+
+
+class FakeTable:
+    """Records what a batch_writer would put."""
+
+    def __init__(self):
+        self.written = []
+
+    def batch_writer(self, overwrite_by_pkeys=None):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def put_item(self, Item):
+        self.written.append(Item)
+
+
+@pytest.fixture
+def table(monkeypatch):
+    table = FakeTable()
+    monkeypatch.setattr(resume, 'results_table', table)
+    monkeypatch.setattr(resume, 'RESULTS_INGEST_TOKEN', TOKEN)
+    return table
+
+
+def result(resume_id='r1', **fields):
+    return {'ResumeID': resume_id, 'JDID': 'job-descriptions/dev.pdf', 'Score': 80, **fields}
+
+
+def post(body, token=TOKEN):
+    headers = {'Authorization': f'Bearer {token}'} if token else {}
+    return resume.app.test_client().post('/batches/batch-1/results', json=body, headers=headers)
+
+
+def test_valid_result_is_tagged_and_scored_as_a_decimal():
+    item, error = resume.validate_result(result(Score='72.5', Name='Jane', BatchID='batch-1'), 'batch-1')
+    assert error is None
+    assert item == {'BatchID': 'batch-1', 'ResumeID': 'r1', 'JDID': 'job-descriptions/dev.pdf',
+                    'Name': 'Jane', 'Score': Decimal('72.5')}
+
+
+@pytest.mark.parametrize('entry, message', [
+    ('r1', 'must be an object'),
+    ({'ResumeID': 'r1', 'JDID': 'job-descriptions/dev.pdf'}, 'missing Score'),
+    ({'ResumeID': '', 'Score': 1}, 'missing ResumeID, JDID'),
+    (result(Salary='100k'), 'unknown fields Salary'),
+    (result(BatchID='batch-2'), 'BatchID does not match'),
+    (result(Name=7), 'Name must be a string'),
+    (result(Score='high'), 'Score must be a number'),
+    (result(Score=True), 'Score must be a number'),
+    (result(Score=[80]), 'Score must be a number'),
+    (result(Score=math.nan), 'between 0 and 100'),
+    (result(Score='NaN'), 'between 0 and 100'),
+    (result(Score=math.inf), 'between 0 and 100'),
+    (result(Score='-Infinity'), 'between 0 and 100'),
+    (result(Score=101), 'between 0 and 100'),
+    (result(Score=-0.5), 'between 0 and 100'),
+])
+def test_invalid_results_are_reported(entry, message):
+    item, error = resume.validate_result(entry, 'batch-1')
+    assert item is None
+    assert message in error
+
+
+def test_posted_results_are_written(table):
+    response = post([result('r1'), result('r2', Score='55')])
+
+    assert response.status_code == 200
+    assert response.get_json()['written'] == 2
+    assert [item['ResumeID'] for item in table.written] == ['r1', 'r2']
+
+
+def test_nothing_is_written_when_any_entry_is_invalid(table):
+    response = post({'results': [result('r1'), result('r2', Score=150), result('r3')]})
+
+    assert response.status_code == 400
+    assert response.get_json()['invalid'] == [{'index': 1, 'error': 'Score must be between 0 and 100'}]
+    assert table.written == []
+
+
+@pytest.mark.parametrize('token', [None, 'wrong-secret'])
+def test_posting_without_the_token_is_refused(table, token):
+    assert post([result()], token=token).status_code == 401
+    assert table.written == []
+
+
+def test_posting_is_disabled_when_no_token_is_configured(table, monkeypatch):
+    monkeypatch.setattr(resume, 'RESULTS_INGEST_TOKEN', '')
+    assert post([result()], token='').status_code == 503
+    assert table.written == []
@@ -0,0 +1,37 @@
+import pytest
+
+import resume
+
+BUCKET = resume.S3_BUCKET_NAME
+KEY = 'resumes/pending/batch-1/jane doe.pdf'
+
+
+@pytest.mark.parametrize('reference', [
+    KEY,
+    f's3://{BUCKET}/{KEY}',
+    f'https://{BUCKET}.s3.us-east-1.amazonaws.com/resumes/pending/batch-1/jane%20doe.pdf',
+    f'https://s3.us-east-1.amazonaws.com/{BUCKET}/resumes/pending/batch-1/jane%20doe.pdf',
+    f'  {KEY}  ',
+])
+def test_references_to_batch_resumes_resolve_to_the_key(reference):
+    assert resume.resume_key_from_reference(reference) == KEY
+
+
+@pytest.mark.parametrize('reference', [
+    None,
+    '',
+    'resumes/manifests/batch-1.json',
+    'job-descriptions/dev.pdf',
+    'resumes/pending/../manifests/batch-1.json',
+    f's3://other-bucket/{KEY}',
+    f'https://other-bucket.s3.amazonaws.com/{KEY}',
+    f'https://s3.amazonaws.com/other-bucket/{KEY}',
+    f's3://{BUCKET}/resumes/manifests/batch-1.json',
+])
+def test_other_objects_are_refused(reference):
+    assert resume.resume_key_from_reference(reference) is None
+
+
+def test_download_refuses_manifests():
+    response = resume.app.test_client().get('/resumes/download?key=resumes/manifests/batch-1.json')
+    assert response.status_code == 400
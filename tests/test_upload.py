@@ -0,0 +1,65 @@
+import io
+
+import pytest
+
+import resume
+
+
+def multipart_request(files, fields=None):
+    data = dict(fields or {})
+    data['resumes'] = [(io.BytesIO(body), name) for name, body in files]
+    return resume.app.test_request_context('/upload', method='POST', data=data,
+                                           content_type='multipart/form-data')
+
+
+def key_for(filename):
+    return f"resumes/pending/test/{filename}"
+
+
+def test_small_files_are_put_in_one_call(s3):
+    with multipart_request([('a.pdf', b'first'), ('b.pdf', b'second')], {'jd_key': 'job-descriptions/x.pdf'}):
+        fields, uploaded = resume.stream_multipart_to_s3(key_for)
+
+    assert fields.getlist('jd_key') == ['job-descriptions/x.pdf']
+    assert [f['key'] for f in uploaded] == [key_for('a.pdf'), key_for('b.pdf')]
+    assert uploaded[0]['size'] == 5
+    assert s3.objects == {key_for('a.pdf'): b'first', key_for('b.pdf'): b'second'}
+    assert not s3.multipart
+
+
+def test_file_larger_than_a_part_uses_multipart_upload(s3, monkeypatch):
+    monkeypatch.setattr(resume, 'UPLOAD_PART_SIZE_BYTES', 4)
+    body = b'0123456789'
+    with multipart_request([('big.pdf', body)]):
+        _, uploaded = resume.stream_multipart_to_s3(key_for)
+
+    assert s3.objects[key_for('big.pdf')] == body
+    assert not s3.multipart
+    assert uploaded[0]['size'] == len(body)
+
+
+def test_oversized_file_aborts_upload_and_deletes_earlier_files(s3, monkeypatch):
+    # Small reads, so parts of the oversized file are already in S3 when the limit is hit
+    monkeypatch.setattr(resume, 'UPLOAD_PART_SIZE_BYTES', 4)
+    monkeypatch.setattr(resume, 'UPLOAD_READ_CHUNK_BYTES', 8)
+    with multipart_request([('ok.pdf', b'abc'), ('huge.pdf', b'x' * 64)]):
+        with pytest.raises(resume.UploadLimitExceeded):
+            resume.stream_multipart_to_s3(key_for, max_file_bytes=16)
+
+    assert s3.aborted == [key_for('huge.pdf')]
+    assert s3.objects == {}
+    assert not s3.multipart
+
+
+def test_too_many_files_deletes_what_was_uploaded(s3):
+    with multipart_request([('a.pdf', b'a'), ('b.pdf', b'b'), ('c.pdf', b'c')]):
+        with pytest.raises(resume.UploadLimitExceeded, match='at most 2 files'):
+            resume.stream_multipart_to_s3(key_for, max_files=2)
+
+    assert s3.objects == {}
+
+
+def test_non_multipart_body_is_rejected(s3):
+    with resume.app.test_request_context('/upload', method='POST', json={'jd_key': 'x'}):
+        with pytest.raises(ValueError):
+            resume.stream_multipart_to_s3(key_for)